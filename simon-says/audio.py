@@ -1,6 +1,19 @@
-"""Audio helpers – generates tones on‑the‑fly with NumPy and handles mono/stereo."""
+"""Audio helpers – generates tones with NumPy and handles mono/stereo.
 
+Finished PCM is kept in a :class:`ToneBank`: an on-disk store of ``.npy``
+files (memory-mapped on load) keyed by tone parameters and mixer format.
+Missing tones are synthesised on a background thread and the
+``pygame.mixer.Sound`` objects are only created on first use.
+
+Playback goes through an :class:`AudioEngine`: a fixed pool of voices with
+explicit stealing rules, plus one reserved channel onto which whole SHOW
+sequences are mixed ahead of time so tone onsets are sample-accurate.
+"""
+
+import hashlib, os, pathlib, statistics, threading, time
+from concurrent.futures import ThreadPoolExecutor
 import pygame
+from constants import AUDIO_RATE, AUDIO_BUFFER, AUDIO_VOICES
 
 try:
     import numpy as np
@@ -8,21 +21,306 @@ try:
 except ModuleNotFoundError:  # fallback – silent mode
     _HAS_NUMPY = False
 
+ENVELOPE = (1.0, .05)   # linear amplitude ramp, start → end
+
 
-def _stereo(array: "np.ndarray"):
-    """Ensure (N, 2) shape for stereo mixers; duplicates mono to both channels."""
-    if array.ndim == 1:
-        return np.column_stack([array, array])
-    return array
+def _synth(freq, dur, vol, envelope, sr, ch) -> "np.ndarray":
+    """Render a decaying sine straight into an int16 (N,) or (N, ch) buffer."""
+    n = int(sr * dur)
+    wave = np.arange(n, dtype=np.float32)
+    env = np.linspace(envelope[0] * vol * 32767, envelope[1] * vol * 32767, n, dtype=np.float32)
+    wave *= np.float32(2 * np.pi * freq / sr)
+    np.sin(wave, out=wave)
+    wave *= env
+    if ch == 1:
+        return wave.astype(np.int16)
+    out = np.empty((n, ch), np.int16)
+    out[:] = wave[:, None]
+    return out
 
 
 def make_tone(freq: float, dur: float = .35, vol: float = 1.0):
     if not (_HAS_NUMPY and pygame.mixer.get_init()):
         return None
     sr, size, ch = pygame.mixer.get_init()
-    t = np.linspace(0, dur, int(sr * dur), endpoint=False)
-    wave = np.sin(2 * np.pi * freq * t) * np.linspace(1, .05, t.size)
-    audio = np.int16(wave * vol * 32767)
-    if ch == 2:
-        audio = _stereo(audio)
-    return pygame.sndarray.make_sound(audio)
\ No newline at end of file
+    return pygame.sndarray.make_sound(_synth(freq, dur, vol, ENVELOPE, sr, ch))
+
+
+# ---------------- Persistent tone bank ---------------------
+class LazyTone:
+    """Stand-in for ``pygame.mixer.Sound``; builds the real Sound on first use."""
+    __slots__ = ("_bank", "key", "_sound")
+
+    def __init__(self, bank, key):
+        self._bank, self.key, self._sound = bank, key, None
+
+    @property
+    def sound(self) -> pygame.mixer.Sound:
+        if self._sound is None:
+            self._sound = pygame.sndarray.make_sound(self._bank.pcm(self.key))
+        return self._sound
+
+    def play(self, *args, **kwargs):
+        return self.sound.play(*args, **kwargs)
+
+    def stop(self):
+        if self._sound is not None:
+            self._sound.stop()
+
+
+class ToneBank:
+    def __init__(self, path="simon_tones", envelope=ENVELOPE):
+        self.path     = pathlib.Path(path)
+        self.envelope = tuple(envelope)
+        self._pending = {}                   # key -> Future
+        self._tones   = {}                   # key -> LazyTone, shared by every caller
+        self._lock    = threading.Lock()
+        self._pool    = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tonebank")
+
+    def _file(self, key) -> pathlib.Path:
+        """Named by a hash of the exact key: rounded values could collide."""
+        freq, dur, *_ = key
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=10).hexdigest()
+        return self.path / f"{freq:.0f}Hz_{dur * 1000:.0f}ms_{digest}.npy"
+
+    def tone(self, freq: float, dur: float = .35, vol: float = 1.0):
+        """Return a lazily-loaded tone, queuing synthesis if it is not on disk yet."""
+        if not (_HAS_NUMPY and pygame.mixer.get_init()):
+            return None
+        key = (float(freq), float(dur), float(vol), self.envelope, *pygame.mixer.get_init())
+        t = self._tones.get(key)
+        if t is None:
+            with self._lock:
+                if key not in self._pending and not self._file(key).exists():
+                    self._pending[key] = self._pool.submit(self._build, key)
+            t = self._tones[key] = LazyTone(self, key)
+        return t
+
+    def _build(self, key):
+        freq, dur, vol, env, sr, size, ch = key
+        pcm = _synth(freq, dur, vol, env, sr, ch)
+        f = self._file(key)
+        tmp = f.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            f.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as fh:
+                np.save(fh, pcm)
+            os.replace(tmp, f)
+        except OSError:                     # read-only location – serve from memory
+            pass
+        return pcm
+
+    def pcm(self, key) -> "np.ndarray":
+        """Finished PCM for ``key``: memory-mapped from disk, or the freshly built buffer."""
+        with self._lock:
+            fut = self._pending.pop(key, None)
+        if fut is not None:
+            return fut.result()
+        try:
+            return np.load(self._file(key), mmap_mode="r")
+        except (OSError, ValueError):       # missing or truncated entry – rebuild
+            return self._build(key)
+
+    def wait(self):
+        """Block until every queued synthesis has finished."""
+        with self._lock:
+            futs = list(self._pending.values())
+        for f in futs:
+            f.result()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+# ---------------- Voice pool & scheduler -------------------
+PRIO_PRESS, PRIO_UI = 1, 2      # UI cues (round won, game over) are never stolen by presses
+
+
+def pre_init(buffer: int = AUDIO_BUFFER, rate: int = AUDIO_RATE) -> int:
+    """Configure the mixer before ``pygame.init``; ``SIMON_AUDIO_BUFFER`` overrides ``buffer``."""
+    buffer = int(os.environ.get("SIMON_AUDIO_BUFFER", buffer))
+    pygame.mixer.pre_init(rate, -16, 2, buffer)
+    return buffer
+
+
+class AudioEngine:
+    """``voices`` mixer channels for one-shot sounds plus reserved sequence and probe channels.
+
+    Stealing rules for :meth:`play`: take a free voice; otherwise the oldest
+    voice whose priority is not above the new sound's; otherwise drop it.
+    """
+    CHUNK_MS = 4000                 # scheduled sequences are mixed and queued in chunks this long
+
+    def __init__(self, voices: int = AUDIO_VOICES, buffer: int = AUDIO_BUFFER):
+        self.voices     = voices
+        self.buffer     = buffer
+        self.stolen     = self.dropped = 0
+        self.ok         = bool(_HAS_NUMPY and pygame.mixer.get_init())
+        self.rate, _, self.ch = pygame.mixer.get_init() if self.ok else (AUDIO_RATE, -16, 2)
+        self.latency_ms = 2 * buffer / self.rate * 1000     # estimate until measured
+        self._started   = [0.0] * voices
+        self._prio      = [0] * voices
+        self._pcm       = {}                # id(Sound) -> int16 PCM, for sequence mixing
+        self._seq       = []                # pending (onset sample, pcm), sorted by onset
+        self._pos       = 0                 # samples of the sequence already queued
+        self._src       = None              # scheduled (sound, onset ms) not pulled into _seq yet
+        self._next      = None              # ... and the first of them
+        self._lead      = 0.0
+        self._mix       = None              # int32 / int16 chunk buffers, reused by _mix_chunk
+        self._mix16     = None
+        self._probe_lag = self._probe_snd = None     # latency probe, while one runs
+        if self.ok:
+            pygame.mixer.set_num_channels(voices + 2)
+            pygame.mixer.set_reserved(2)
+            self.seq_ch   = pygame.mixer.Channel(0)
+            self._probe   = pygame.mixer.Channel(1)     # latency measurement only
+            self._ch      = [pygame.mixer.Channel(i + 2) for i in range(voices)]
+
+    # ---------------- One-shot voices ----------------------------
+    def play(self, sound, prio: int = PRIO_PRESS, fade_ms: int = 0):
+        """Play ``sound`` (a Sound or LazyTone) on a pool voice; returns the voice index or None."""
+        if not self.ok or sound is None:
+            return None
+        i = next((i for i, c in enumerate(self._ch) if not c.get_busy()), None)
+        if i is None:
+            steal = [k for k in range(self.voices) if self._prio[k] <= prio]
+            if not steal:
+                self.dropped += 1
+                return None
+            i = min(steal, key=self._started.__getitem__)
+            self.stolen += 1
+        self._ch[i].play(getattr(sound, "sound", sound), fade_ms=fade_ms)
+        self._started[i], self._prio[i] = time.perf_counter(), prio
+        return i
+
+    def busy_voices(self) -> int:
+        return sum(c.get_busy() for c in self._ch) if self.ok else 0
+
+    # ---------------- Scheduled sequences ------------------------
+    def _samples(self, sound):
+        snd = getattr(sound, "sound", sound)
+        pcm = self._pcm.get(id(snd))
+        if pcm is None:
+            pcm = pygame.sndarray.array(snd)
+            pcm = self._pcm[id(snd)] = pcm.reshape(len(pcm), -1)
+        return pcm
+
+    def schedule(self, sounds, onsets_ms):
+        """Play ``sounds[k]`` ``onsets_ms[k]`` ms from now, sample-accurately.
+
+        Both may be lazy iterables, with onsets ascending: steps are pulled
+        only as the next two chunks need them, so a SHOW of any length costs
+        the same per chunk.  Onsets are pulled forward by :attr:`latency_ms`
+        (as far as the first one allows) so each tone reaches the speaker
+        when it is due.  Any previously scheduled sequence is cancelled.
+        """
+        self.cancel()
+        if not self.ok:
+            return
+        src = ((s, t) for s, t in zip(sounds, onsets_ms) if s is not None)
+        first = next(src, None)
+        if first is None:
+            return
+        self._lead = min(self.latency_ms, first[1])
+        self._src, self._next = src, first
+        self.pump()
+
+    def _refill(self, until: int):
+        """Move scheduled steps with onsets before sample ``until`` into ``_seq``."""
+        sr = self.rate / 1000
+        while self._next is not None:
+            s, t = self._next
+            onset = int((t - self._lead) * sr)
+            if onset >= until:
+                return
+            self._seq.append((onset, self._samples(s)))
+            self._next = next(self._src, None)
+
+    def pump(self):
+        """Keep one chunk queued behind the playing one; call once per frame."""
+        if self._probe_lag is not None:
+            self._probe_check()
+        if (self._seq or self._next is not None) and self.seq_ch.get_queue() is None:
+            chunk = self._mix_chunk()
+            if self.seq_ch.get_busy():
+                self.seq_ch.queue(chunk)
+            else:
+                self.seq_ch.play(chunk)
+
+    def _mix_chunk(self):
+        pos = self._pos
+        size = int(self.CHUNK_MS * self.rate / 1000)
+        self._refill(pos + 2 * size)        # this chunk and the next
+        if self._mix is None:
+            self._mix   = np.empty((size, self.ch), np.int32)
+            self._mix16 = np.empty((size, self.ch), np.int16)
+        n = size
+        if self._next is None:              # the last steps: stop where they end
+            n = min(size, max(t + len(p) for t, p in self._seq) - pos)
+        buf = self._mix[:n]
+        buf.fill(0)
+        keep = []
+        for t, p in self._seq:
+            a, b = max(t, pos), min(t + len(p), pos + n)
+            if a < b:
+                buf[a - pos:b - pos] += p[a - t:b - t]
+            if t + len(p) > pos + n:
+                keep.append((t, p))
+        self._seq, self._pos = keep, pos + n
+        np.clip(buf, -32768, 32767, out=buf)
+        out = self._mix16[:n]
+        np.copyto(out, buf, casting="unsafe")
+        return pygame.sndarray.make_sound(out if self.ch > 1 else out[:, 0])   # copies the PCM
+
+    def cancel(self):
+        self._seq, self._pos = [], 0
+        self._src = self._next = None
+        if self.ok:
+            self.seq_ch.stop()
+
+    # ---------------- Latency ------------------------------------
+    def start_probe(self, trials: int = 5):
+        """Start measuring output latency; :meth:`pump` finishes it into :attr:`latency_ms`.
+
+        Plays a short silent buffer on a spare channel ``trials`` times and
+        times how long past its length the mixer takes to finish it, plus one
+        device buffer.  Nothing blocks: each :meth:`pump` checks the channel,
+        and a finish is placed midway between the last two checks.
+        """
+        if not self.ok:
+            return
+        n = self.buffer * 4
+        self._probe_snd = pygame.sndarray.make_sound(np.zeros((n, self.ch) if self.ch > 1 else n, np.int16))
+        self._probe_len = n / self.rate * 1000
+        self._probe_trials = trials
+        self._probe_lag = []
+        self._probe_play()
+
+    @property
+    def probing(self) -> bool:
+        return self._probe_lag is not None
+
+    def _probe_play(self):
+        self._probe.play(self._probe_snd)
+        self._probe_t0 = self._probe_seen = time.perf_counter()
+
+    def _probe_check(self):
+        now = time.perf_counter()
+        if self._probe.get_busy() and now - self._probe_t0 < 1:
+            self._probe_seen = now              # still playing at this check
+            return
+        done = (self._probe_seen + now) / 2
+        self._probe_lag.append((done - self._probe_t0) * 1000 - self._probe_len)
+        if len(self._probe_lag) < self._probe_trials:
+            self._probe_play()
+            return
+        period = self.buffer / self.rate * 1000
+        self.latency_ms = max(0.0, statistics.median(self._probe_lag)) + period
+        self._probe_lag = self._probe_snd = None
+
+    def close(self):
+        """Stop the sequence and any probe; call before the mixer is shut down."""
+        self.cancel()
+        if self.ok:
+            self._probe.stop()
+        self._probe_lag = self._probe_snd = None
@@ -0,0 +1,445 @@
+"""Headless, seeded benchmarks for the render / update hot paths.
+
+    python bench.py --out bench.json
+    python bench.py --baseline bench.json --threshold 0.25   # exit 1 on regression
+
+Runs on SDL's dummy video/audio drivers so it works on a CI box without a
+display.  Each scenario scripts the game through a fixed sequence of frames
+on a simulated clock; every timed call is recorded and summarised as
+latency percentiles, frames per second and peak traced memory.
+
+``--render surface texture`` runs every scenario on both render backends;
+texture results are keyed ``scenario@texture``.
+
+``--alloc [BYTES]`` runs the real SHOW and PLAY frame loops under
+:class:`profiler.AllocProfiler` and fails when a steady frame allocates more
+than BYTES on average, keeps objects alive or triggers a collection.
+"""
+
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse, json, platform, random, sys, time, tracemalloc
+import numpy as np
+import pygame
+
+from constants import *
+import core
+from core import SimonCore
+from audio import pre_init
+from effects import ParticleSystem
+from scores import ScoreStore
+
+FRAME_MS = 1000 // FPS
+
+
+class Recorder:
+    """Collects per-call durations (ns) under a name."""
+    def __init__(self):
+        self.samples: dict[str, list[int]] = {}
+
+    def time(self, name, fn, *args):
+        t0 = time.perf_counter_ns()
+        r = fn(*args)
+        self.samples.setdefault(name, []).append(time.perf_counter_ns() - t0)
+        return r
+
+    def summary(self) -> dict:
+        out = {}
+        for name, s in self.samples.items():
+            a = np.asarray(s, np.float64) / 1000
+            p50, p90, p99 = np.percentile(a, [50, 90, 99])
+            out[name] = {"calls": a.size, "mean_us": round(a.mean(), 2), "p50_us": round(p50, 2),
+                         "p90_us": round(p90, 2), "p99_us": round(p99, 2), "max_us": round(a.max(), 2)}
+        return out
+
+
+# ---------------- Scenarios ------------------------------------
+def _scratch_scores():
+    """An in-memory store: benchmark games never reach the player's leaderboard."""
+    return ScoreStore(":memory:", legacy_json=None)
+
+def _new_game(seed, board=None, render="surface"):
+    from game import SimonGame
+    g = SimonGame(board=board, render=render, scores=_scratch_scores())
+    g.ready.wait()
+    g.core = SimonCore(g.bank.n, seed=seed, clock=lambda: 0)
+    g.fx = ParticleSystem(seed=seed)
+    return g
+
+def _frames(g, rec, frames, now, script=None):
+    """Run ``frames`` game frames on a simulated clock, timing each phase."""
+    t0 = time.perf_counter()
+    for f in range(frames):
+        now += FRAME_MS
+        if script:
+            script(g, f, now)
+        rec.time("frame", _frame, g, rec, now)
+    return frames / (time.perf_counter() - t0), now
+
+def _frame(g, rec, now):
+    rec.time("core.update", g.core.update, now)
+    g._react(now)
+    rec.time("ButtonBank.update", g.bank.update, now)
+    rec.time("ParticleSystem.update", g.fx.update)
+    rects = rec.time("SimonGame._draw", g._draw, now)
+    rec.time("present", g.gfx.present, rects)
+
+def scenario_idle_start(g, rec, frames, seed):
+    return _frames(g, rec, frames, 0)[0]
+
+def scenario_long_show(g, rec, frames, seed):
+    g.core.start(0)
+    g.core.pattern[:] = random.Random(seed).choices(range(g.bank.n), k=500)
+    return _frames(g, rec, frames, 0)[0]
+
+def scenario_play_timer(g, rec, frames, seed):
+    c = g.core
+    c.start(0); c.state = core.PLAY; c.player_idx = 0
+    c.pattern[:] = [0] * 10_000
+    c.deadline_ms = PLAYER_TIME_MS
+    def script(g, f, now):
+        if f % 20 == 0:                 # a correct press every 1/3 s keeps the bar alive
+            g._click(g.bank.center(c.pattern[c.player_idx]), now)
+    return _frames(g, rec, frames, 0, script)[0]
+
+def scenario_gameover_storm(g, rec, frames, seed):
+    colours = g.bank.light_colours()
+    g.core.start(0); g.core.state = core.PLAY; g.core.deadline_ms = -1
+    def script(g, f, now):
+        if f % 2 == 0:                  # keep ~3-4k particles alive
+            g.fx.burst(CENTER_X, CENTER_Y, colours, 180)
+    return _frames(g, rec, frames, 0, script)[0]
+
+def scenario_grid_32x32(g, rec, frames, seed):
+    c = g.core
+    rng = random.Random(seed)
+    c.start(0); c.state = core.PLAY; c.player_idx = 0
+    c.pattern[:] = [rng.randrange(g.bank.n) for _ in range(10_000)]
+    c.deadline_ms = PLAYER_TIME_MS
+    def script(g, f, now):
+        if f % 3 == 0:                  # fast correct presses across the big board
+            g._click(g.bank.center(c.pattern[c.player_idx]), now)
+    return _frames(g, rec, frames, 0, script)[0]
+
+SCENARIOS = {
+    "idle_start":     scenario_idle_start,
+    "long_show":      scenario_long_show,
+    "play_timer":     scenario_play_timer,
+    "gameover_storm": scenario_gameover_storm,
+    "grid_32x32":     scenario_grid_32x32,
+}
+BOARDS = {"grid_32x32": (32, 32)}
+
+
+# ---------------- Micro benchmarks ------------------------------
+def micro_buttons(rec, iters, seed):
+    from button import Button
+    surf = pygame.Surface((WIDTH, HEIGHT))
+    b = Button(pygame.Rect(100, 100, BTN_SIZE, BTN_SIZE), DARK_RED, RED)
+    for i in range(iters):
+        if i % 30 == 0:
+            b.light_up(i * FRAME_MS)
+        rec.time("Button.update", b.update, i * FRAME_MS)
+        rec.time("Button.draw", b.draw, surf)
+
+def micro_particles(rec, iters, seed, live=50_000):
+    surf = pygame.display.get_surface()
+    fx = ParticleSystem(capacity=2 * live, seed=seed)
+    colours = [light for _, light in BUTTON_COLOURS]
+    while len(fx) < live:
+        fx.burst(CENTER_X, CENTER_Y, colours, 1000)
+    for i in range(iters):
+        fx.burst(CENTER_X, CENTER_Y, colours, max(0, live - len(fx)))
+        rec.time("ParticleSystem.update[50k]", fx.update)
+        rec.time("ParticleSystem.draw[50k]", fx.draw, surf, 1.0, surf.get_rect())
+
+def micro_tones(rec, iters, seed):
+    from audio import make_tone
+    for i in range(iters):
+        rec.time("make_tone", make_tone, BUTTON_FREQS[i % len(BUTTON_FREQS)])
+
+def micro_audio(rec, iters, seed):
+    from audio import AudioEngine, make_tone
+    eng = AudioEngine()
+    tones = [make_tone(f) for f in BUTTON_FREQS]
+    rng = random.Random(seed)
+    pattern = [rng.randrange(len(tones)) for _ in range(50)]
+    for i in range(iters):
+        rec.time("AudioEngine.play", eng.play, tones[i % len(tones)])
+        if i % 30 == 0:
+            rec.time("AudioEngine.schedule[50]", eng.schedule, [tones[k] for k in pattern],
+                     [SHOW_START_MS + k * SHOW_STEP_MS for k in range(len(pattern))])
+    eng.cancel()
+
+def micro_pattern(rec, iters, seed):
+    c = SimonCore(6, seed=seed, clock=lambda: 0)
+    rng = random.Random(seed)
+    for i in range(iters):
+        rec.time("SimonCore.resume[1M]", c.resume, 1_000_000 + i, None, 0)
+        rec.time("Pattern[k]", c.pattern.__getitem__, rng.randrange(len(c.pattern)))
+        rec.time("Pattern.grow", c.pattern.grow)
+
+def micro_tournament(rec, iters, seed, k=8):
+    from tournament import Tournament
+    t = Tournament(k, seed=seed, bots=True)
+    wall = 0.0
+    def frame():
+        for _ in range(t.step.advance(wall)):
+            t._logic_step()
+        t.present()
+    for i in range(iters):
+        wall += FRAME_MS
+        rec.time(f"Tournament.frame[{k}]", frame)
+    t.audio.cancel()
+
+MICROS = {"buttons": micro_buttons, "particles": micro_particles, "tones": micro_tones,
+          "audio": micro_audio, "pattern": micro_pattern, "tournament": micro_tournament}
+
+
+# ---------------- Idle CPU check -----------------------------------
+def idle_cpu(seconds: float = 3.0, seed: int = 0) -> dict:
+    """Run the real main loop on the START screen; CPU time / wall time.
+
+    Ends with ``pygame.quit()``, so run it after everything else.
+    """
+    import threading
+    from game import SimonGame
+    g = SimonGame(seed=seed, scores=_scratch_scores())
+    g.ready.wait()
+    threading.Timer(seconds, pygame.event.post, (pygame.event.Event(pygame.QUIT),)).start()
+    c0, t0 = time.process_time(), time.perf_counter()
+    g.run()
+    cpu, wall = time.process_time() - c0, time.perf_counter() - t0
+    return {"cpu_fraction": round(cpu / wall, 4), "wall_s": round(wall, 2), "idle_wakes": g.idle_wakes}
+
+
+# ---------------- Input latency ------------------------------------
+def input_latency(clicks: int = 60, fast: bool = False, seed: int = 0) -> dict:
+    """Click -> state / audio / present latency of the real main loop.
+
+    A thread plays the game by posting clicks at random intervals (correct
+    pads during PLAY).  Ends with ``pygame.quit()``, like :func:`idle_cpu`.
+    """
+    import threading
+    from game import SimonGame
+    from profiler import InputLatency
+    g = SimonGame(seed=seed, fast_input=fast, scores=_scratch_scores())
+    g.lat = InputLatency()
+    g.ready.wait()
+    rng = random.Random(seed)
+
+    def player():
+        for _ in range(clicks):
+            time.sleep(rng.uniform(.03, .12))
+            c = g.core
+            pos = g.bank.center(c.pattern[c.player_idx]) if c.state == core.PLAY else (5, 5)
+            pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos))
+        time.sleep(.1)
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+    threading.Thread(target=player, daemon=True).start()
+    g.run()
+    return g.lat.summary()
+
+
+# ---------------- Allocation budget --------------------------------
+def alloc_budget(frames: int = 1200, seed: int = 0, warmup: int = 300) -> dict:
+    """Allocations of steady SHOW and PLAY frames, per :meth:`AllocProfiler.summary`.
+
+    Drives the main loop's own steps (``_logic_step``, ``_present``) on a
+    simulated clock, four logic steps per frame.  Every pad frame is rendered
+    up front and the profiler is attached after ``warmup`` frames, so caches
+    filling up do not count.
+    """
+    from game import SimonGame
+    from button import LEVELS
+    from profiler import AllocProfiler, FrameProfiler
+    g = SimonGame(seed=seed, scores=_scratch_scores())
+    g.ready.wait()
+    for i in range(g.bank.n):
+        for level in range(LEVELS):
+            g.bank.bounds(i, level)
+    step = g.step
+    step.acc = 0.0
+
+    def frame(f, script):
+        prof = g.prof
+        prof.begin()
+        script(f)
+        prof.mark(0)
+        for _ in range(4):
+            step.acc += step.step_ms
+            g._apply_input()
+            g._logic_step()
+        g._apply_input()
+        g.audio.pump()
+        g._present()
+        prof.mark(5)
+        prof.end()
+
+    def show():
+        g.core.start(step.sim_ms)
+        g.core.pattern[:] = random.Random(seed).choices(range(g.bank.n), k=frames + warmup)
+        return lambda f: None
+
+    def play():
+        c = g.core
+        c.start(step.sim_ms); c.state = core.PLAY; c.player_idx = 0
+        c.pattern[:] = [0] * (frames + warmup)
+        c.deadline_ms = step.sim_ms + PLAYER_TIME_MS
+        def script(f):
+            if f % 20 == 0:             # a correct press every 1/3 s
+                g._click(g.bank.center(c.pattern[c.player_idx]), step.sim_ms)
+        return script
+
+    out = {}
+    for name, setup in (("show", show), ("play", play)):
+        script = setup()
+        g.prof = FrameProfiler()
+        for f in range(warmup):
+            frame(f, script)
+        g.prof = AllocProfiler(capacity=frames)
+        for f in range(frames):
+            frame(warmup + f, script)
+        g.prof.stop()
+        out[name] = g.prof.summary()
+        out[name]["state"] = g.state
+    g.audio.cancel()
+    return out
+
+
+# ---------------- Driver -------------------------------------------
+def _run_one(fn, frames, seed, game, board=None, render="surface"):
+    rec = Recorder()
+    random.seed(seed)
+    res = {}
+    if game:
+        g = _new_game(seed, board, render)
+        res["render"] = g.gfx.name + (" (accelerated)" if g.gfx.accelerated else "")
+        fps = fn(g, rec, frames, seed)
+    else:
+        fps = fn(rec, frames, seed)
+    res["calls"] = rec.summary()
+    if fps:
+        res["fps"] = round(fps, 1)
+
+    # second, shorter pass under tracemalloc for peak memory of the scenario itself
+    rec = Recorder()
+    if game:
+        g = _new_game(seed, board, render)
+        tracemalloc.start()
+        fn(g, rec, max(1, frames // 4), seed)
+    else:
+        tracemalloc.start()
+        fn(rec, max(1, frames // 4), seed)
+    res["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    tracemalloc.stop()
+    return res
+
+def run(names=None, frames=600, seed=1234, renders=("surface",)):
+    results = {}
+    for name, fn in SCENARIOS.items():
+        if not names or name in names:
+            for render in renders:
+                key = name if render == "surface" else f"{name}@{render}"
+                results[key] = _run_one(fn, frames, seed, game=True, board=BOARDS.get(name),
+                                        render=render)
+    for name, fn in MICROS.items():
+        if not names or name in names:
+            results[name] = _run_one(fn, min(frames, 200), seed, game=False)
+    return {"meta": {"python": platform.python_version(), "pygame": pygame.version.ver,
+                     "numpy": np.__version__, "machine": platform.machine(),
+                     "frames": frames, "seed": seed},
+            "results": results}
+
+def compare(current, baseline, threshold=.25, metrics=("p50_us", "p99_us"), min_delta_us=5.0):
+    """Return a list of human-readable regressions beyond ``threshold`` (fractional).
+
+    Slowdowns smaller than ``min_delta_us`` in absolute terms are timer noise
+    and never count.
+    """
+    bad = []
+    for scen, res in current["results"].items():
+        base = baseline.get("results", {}).get(scen)
+        if not base:
+            continue
+        for call, stats in res["calls"].items():
+            ref = base["calls"].get(call)
+            if not ref:
+                continue
+            for m in metrics:
+                if stats[m] > ref[m] * (1 + threshold) and stats[m] - ref[m] > min_delta_us:
+                    bad.append(f"{scen}/{call} {m}: {ref[m]} -> {stats[m]} us "
+                               f"(+{(stats[m]/ref[m] - 1)*100:.0f}%)")
+    return bad
+
+def _print(report):
+    for scen, res in report["results"].items():
+        extra = f"  {res['fps']} fps" if "fps" in res else ""
+        extra += f"  [{res['render']}]" if "render" in res else ""
+        print(f"{scen}{extra}  peak {res['peak_kib']} KiB")
+        for call, s in res["calls"].items():
+            print(f"    {call:<28} p50 {s['p50_us']:>9} us  p90 {s['p90_us']:>9}  p99 {s['p99_us']:>9}  n={s['calls']}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Simon Says Pro benchmarks")
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--baseline", help="compare against this results JSON")
+    ap.add_argument("--threshold", type=float, default=.25, help="allowed slowdown (0.25 = 25%%)")
+    ap.add_argument("--min-delta-us", type=float, default=5.0, help="ignore slowdowns below this")
+    ap.add_argument("--frames", type=int, default=600)
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--only", nargs="*", help="scenario / micro names to run")
+    ap.add_argument("--idle-cpu", type=float, metavar="MAX", nargs="?", const=.05,
+                    help="also run the idle main loop and fail above this CPU fraction (default 0.05)")
+    ap.add_argument("--latency", type=int, metavar="CLICKS", nargs="?", const=60,
+                    help="also measure click latency of the main loop, with and without the fast input path")
+    ap.add_argument("--render", nargs="+", choices=("surface", "texture"), default=["surface"],
+                    help="render backends to run the scenarios on")
+    ap.add_argument("--alloc", type=int, metavar="BYTES", nargs="?", const=1024,
+                    help="also check steady SHOW / PLAY frames allocate under BYTES each (default 1024)")
+    a = ap.parse_args(argv)
+
+    pre_init()
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+
+    report = run(a.only, a.frames, a.seed, a.render)
+    _print(report)
+    bad = []
+    if a.latency:
+        report["latency"] = {}
+        for mode, fast in (("frame", False), ("fast", True)):
+            lat = report["latency"][mode] = input_latency(a.latency, fast, a.seed)
+            print(f"latency [{mode}]  " + "  ".join(f"{k} p50 {v['p50_ms']} / p99 {v['p99_ms']} ms"
+                                                   for k, v in lat.items()))
+    if a.alloc is not None:
+        report["alloc"] = alloc_budget(seed=a.seed)
+        for name, r in report["alloc"].items():
+            print(f"alloc [{name}]  {r['bytes']:.0f} B/frame (max {r['max_bytes']})  "
+                  f"{r['blocks']:+.3f} blocks/frame  {sum(r['collections'])} collections")
+            if r["bytes"] > a.alloc:
+                bad.append(f"alloc [{name}] {r['bytes']:.0f} B/frame > {a.alloc} B")
+            if r["blocks"] > .05:
+                bad.append(f"alloc [{name}] {r['blocks']:+.3f} blocks/frame kept alive")
+            if sum(r["collections"]):
+                bad.append(f"alloc [{name}] {sum(r['collections'])} GC collections in steady frames")
+    if a.idle_cpu is not None:
+        idle = report["idle"] = idle_cpu(seed=a.seed)
+        print(f"idle  {idle['cpu_fraction']:.2%} CPU over {idle['wall_s']} s, {idle['idle_wakes']} wake-ups")
+        if idle["cpu_fraction"] > a.idle_cpu:
+            bad.append(f"idle CPU {idle['cpu_fraction']:.2%} > {a.idle_cpu:.2%}")
+    if a.out:
+        with open(a.out, "w") as fh:
+            json.dump(report, fh, indent=2)
+    if a.baseline:
+        with open(a.baseline) as fh:
+            bad += compare(report, json.load(fh), a.threshold, min_delta_us=a.min_delta_us)
+    for line in bad:
+        print("REGRESSION", line)
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
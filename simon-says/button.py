@@ -1,7 +1,66 @@
-"""Interactive coloured button with animation and optional sound."""
+"""Interactive coloured button with animation and optional sound.
 
-import pygame, math
+The light-up animation (colour blend plus 1.0 → 1.12 scale) is quantised
+into ``LEVELS`` frames.  Each frame is rendered once, on first use, into a
+shared size-bounded LRU so drawing a lit button is a single blit.
+"""
+
+import pygame
+from collections import OrderedDict
 from dataclasses import dataclass
+from typing import ClassVar
+
+LEVELS  = 16                 # animation frames between dark (0) and fully lit
+KEY     = (1, 0, 1)          # colour key for the transparent corners
+RADIUS  = 22
+
+
+class FrameCache:
+    """LRU of pre-rendered button frames, bounded by total pixel bytes.
+
+    The default holds every frame of the six-pad board (about 9.5 MB), so a
+    SHOW never re-renders one.
+    """
+    def __init__(self, max_bytes: int = 16 << 20):
+        self.max_bytes = max_bytes
+        self.bytes     = 0
+        self._frames   = OrderedDict()       # key -> (Surface, dx, dy)
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, build):
+        f = self._frames.get(key)
+        if f is not None:
+            self.hits += 1
+            self._frames.move_to_end(key)
+            return f
+        self.misses += 1
+        f = self._frames[key] = build()
+        self.bytes += f[0].get_bytesize() * f[0].get_width() * f[0].get_height()
+        while self.bytes > self.max_bytes and len(self._frames) > 1:
+            s = self._frames.popitem(last=False)[1][0]
+            self.bytes -= s.get_bytesize() * s.get_width() * s.get_height()
+            self.evictions += 1
+        return f
+
+    def clear(self):
+        self._frames.clear(); self.bytes = 0
+
+
+def render_frame(rect: pygame.Rect, dark_c, light_c, level: int):
+    """One animation frame: (colour-keyed Surface, dx, dy) relative to ``rect``."""
+    t = level / (LEVELS - 1)
+    scale = 1.0 + 0.12 * t
+    colour = tuple(int(light_c[i]*t + dark_c[i]*(1-t)) for i in range(3))
+    r = rect.inflate(rect.w*(scale-1), rect.h*(scale-1))
+    surf = pygame.Surface(r.size)
+    surf.fill(KEY)
+    local = surf.get_rect()
+    radius = min(RADIUS, min(r.size) // 4)
+    pygame.draw.rect(surf, colour, local, border_radius=radius)
+    pygame.draw.rect(surf, (255,255,255), local, width=3 if r.w >= 40 else 1, border_radius=radius)
+    surf.set_colorkey(KEY, pygame.RLEACCEL)
+    return surf, r.x - rect.x, r.y - rect.y
+
 
 @dataclass
 class Button:
@@ -11,11 +70,9 @@ class Button:
     sound:  pygame.mixer.Sound | None = None
 
     _lit_until: int = 0
-    _scale: float = 1.0
-    _colour: tuple[int, int, int] = (0,0,0)
+    _level: int = 0
 
-    def __post_init__(self):
-        self._colour = self.dark_c
+    frames: ClassVar[FrameCache] = FrameCache()
 
     def light_up(self, now: int, ms: int = 450):
         self._lit_until = now + ms
@@ -24,16 +81,29 @@ class Button:
 
     def update(self, now: int):
         if now < self._lit_until:
-            t = (self._lit_until - now) / 450  # 1 → 0
-            self._colour = tuple(int(self.light_c[i]*t + self.dark_c[i]*(1-t)) for i in range(3))
-            self._scale  = 1.0 + 0.12 * t
+            t = min(1.0, (self._lit_until - now) / 450)  # 1 → 0
+            self._level = int(t * (LEVELS - 1) + .5)
         else:
-            self._colour, self._scale = self.dark_c, 1.0
+            self._level = 0
+
+    @property
+    def animating(self) -> bool:
+        return self._level != 0
+
+    def _frame(self):
+        return self.frames.get((self.rect.size, self.dark_c, self.light_c, self._level), self._render)
+
+    def _render(self):
+        return render_frame(self.rect, self.dark_c, self.light_c, self._level)
+
+    def bounds(self) -> pygame.Rect:
+        """Screen area covered by the button at its current scale."""
+        surf, dx, dy = self._frame()
+        return surf.get_rect(topleft=(self.rect.x + dx, self.rect.y + dy))
 
     def draw(self, surf: pygame.Surface):
-        r = self.rect.inflate(self.rect.w*(self._scale-1), self.rect.h*(self._scale-1))
-        pygame.draw.rect(surf, self._colour, r, border_radius=22)
-        pygame.draw.rect(surf, (255,255,255), r, width=3, border_radius=22)
+        frame, dx, dy = self._frame()
+        surf.blit(frame, (self.rect.x + dx, self.rect.y + dy))
 
     def collide(self, pos):
-        return self.rect.collidepoint(pos)
\ No newline at end of file
+        return self.rect.collidepoint(pos)
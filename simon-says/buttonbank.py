@@ -0,0 +1,173 @@
+"""Vectorised bank of board pads with procedural layouts and a spatial hit index.
+
+A :class:`ButtonBank` holds every pad's rect, colours and lit-until time in
+NumPy arrays, so animating a 32x32 board is one vectorised pass.  Clicks are
+resolved through a uniform grid of buckets in O(1).  Pads are drawn with
+the same pre-rendered frames as :class:`button.Button`.
+"""
+
+import math
+import numpy as np
+import pygame
+
+from constants import *
+from button import Button, LEVELS, render_frame
+
+
+# ---------------- Layouts ------------------------------------
+def hex_layout(size: int = BTN_SIZE, margin: int = MARGIN, center=(CENTER_X, CENTER_Y)) -> np.ndarray:
+    """The classic six-pad board: three rows of two, middle row pushed out."""
+    offs = size + margin
+    offsets = [(-offs/2, -offs*1.2), (offs/2, -offs*1.2),
+               (-offs,    0),        (offs,    0),
+               (-offs/2,  offs*1.2), (offs/2,  offs*1.2)]
+    rects = []
+    for dx, dy in offsets:
+        r = pygame.Rect(0, 0, size, size)
+        r.center = (center[0] + dx, center[1] + dy)
+        rects.append(r)
+    return np.array([tuple(r) for r in rects], np.int32)
+
+def grid_layout(cols: int, rows: int, area=pygame.Rect(20, 60, WIDTH - 40, HEIGHT - 120),
+                gap: float = .12) -> np.ndarray:
+    """``cols`` x ``rows`` square pads centred in ``area``; ``gap`` is a fraction of the pitch."""
+    pitch = min(area.w / cols, area.h / rows)
+    size = max(2, int(pitch * (1 - gap)))
+    x0 = area.centerx - pitch * cols / 2 + (pitch - size) / 2
+    y0 = area.centery - pitch * rows / 2 + (pitch - size) / 2
+    gx, gy = np.meshgrid(np.arange(cols), np.arange(rows))
+    xs = (x0 + gx.ravel() * pitch).astype(np.int32)
+    ys = (y0 + gy.ravel() * pitch).astype(np.int32)
+    return np.column_stack([xs, ys, np.full_like(xs, size), np.full_like(xs, size)])
+
+def palette(n: int):
+    """(dark, light) colour pairs: the classic six, then evenly spaced hues."""
+    if n <= len(BUTTON_COLOURS):
+        return BUTTON_COLOURS[:n]
+    out = []
+    for i in range(n):
+        c = pygame.Color(0)
+        c.hsva = (360 * i / n, 72, 100, 100); light = tuple(c)[:3]
+        c.hsva = (360 * i / n, 83, 47, 100);  dark  = tuple(c)[:3]
+        out.append((dark, light))
+    return out
+
+
+# ---------------- Bank ---------------------------------------
+class ButtonBank:
+    frames = Button.frames                  # shared pre-rendered frame LRU
+
+    def __init__(self, rects: np.ndarray, colours, sounds=None):
+        self.n         = len(rects)
+        self.rects     = np.asarray(rects, np.int32)
+        self.dark      = np.array([d for d, _ in colours], np.uint8)
+        self.light     = np.array([l for _, l in colours], np.uint8)
+        self.lit_until = np.zeros(self.n, np.float64)
+        self.level     = np.zeros(self.n, np.int8)
+        self.sounds    = list(sounds) if sounds else [None] * self.n
+        self._t        = np.zeros(self.n, np.float64)    # scratch for update()
+        self._until    = 0.0                # latest lit_until: every pad is dark after it
+        self._all_dark = True               # level is all zeros
+
+        self._rects  = [pygame.Rect(r) for r in self.rects.tolist()]
+        self._dark   = [tuple(c) for c in self.dark.tolist()]
+        self._light  = [tuple(c) for c in self.light.tolist()]
+        self._bounds: list[pygame.Rect | None] = [None] * (self.n * LEVELS)   # [i * LEVELS + level]
+        self._seq    = []                   # draw() batch, reused
+        self._build_index()
+
+    # ---------------- Spatial index ----------------------------
+    def _build_index(self):
+        """Bucket pads into a uniform grid of cells about one pad wide."""
+        self.cell = cell = max(8, int(np.median(self.rects[:, 2])))
+        x0, y0 = self.rects[:, 0].min(), self.rects[:, 1].min()
+        x1 = (self.rects[:, 0] + self.rects[:, 2]).max()
+        y1 = (self.rects[:, 1] + self.rects[:, 3]).max()
+        self.origin = (int(x0), int(y0))
+        self.gw = math.ceil((x1 - x0) / cell)
+        self.gh = math.ceil((y1 - y0) / cell)
+        self.cells: list[list[int]] = [[] for _ in range(self.gw * self.gh)]
+        for i, (x, y, w, h) in enumerate(self.rects.tolist()):
+            for cy in range((y - y0) // cell, (y + h - 1 - y0) // cell + 1):
+                for cx in range((x - x0) // cell, (x + w - 1 - x0) // cell + 1):
+                    self.cells[cy * self.gw + cx].append(i)
+
+    def hit(self, pos) -> int:
+        """Index of the pad under ``pos``, or -1."""
+        cx = (pos[0] - self.origin[0]) // self.cell
+        cy = (pos[1] - self.origin[1]) // self.cell
+        if not (0 <= cx < self.gw and 0 <= cy < self.gh):
+            return -1
+        for i in self.cells[cy * self.gw + cx]:
+            if self._rects[i].collidepoint(pos):
+                return i
+        return -1
+
+    # ---------------- Animation ---------------------------------
+    def light_up(self, i: int, now, ms: int = 450):
+        self.lit_until[i] = now + ms
+        self._until = max(self._until, now + ms)
+        s = self.sounds[i]
+        if s:
+            s.play(fade_ms=25)
+
+    def update(self, now):
+        """Quantised animation level of every pad in one pass, into preallocated arrays."""
+        if now >= self._until:              # all dark: nothing to compute
+            if not self._all_dark:
+                self.level.fill(0)
+                self._all_dark = True
+            return
+        t = self._t
+        np.subtract(self.lit_until, now, out=t)
+        t /= 450
+        np.minimum(t, 1.0, out=t)
+        np.maximum(t, 0.0, out=t)
+        t *= LEVELS - 1; t += .5
+        np.copyto(self.level, t, casting="unsafe")  # truncates, i.e. rounds half up
+        self._all_dark = False
+
+    def animating(self) -> list[int]:
+        return [] if self._all_dark else np.flatnonzero(self.level).tolist()
+
+    # ---------------- Rendering --------------------------------
+    def _frame(self, i, level):
+        r = self._rects[i]
+        return self.frames.get((r.size, self._dark[i], self._light[i], level),
+                               lambda: render_frame(r, self._dark[i], self._light[i], level))
+
+    def bounds(self, i, level=None) -> pygame.Rect:
+        """Screen area of pad ``i`` at ``level`` (default: its current one); shared, do not modify."""
+        if level is None:
+            level = int(self.level[i])
+        b = self._bounds[i * LEVELS + level]
+        if b is None:
+            surf, dx, dy = self._frame(i, level)
+            r = self._rects[i]
+            b = self._bounds[i * LEVELS + level] = surf.get_rect(topleft=(r.x + dx, r.y + dy))
+        return b
+
+    def draw(self, surf, indices=None):
+        """Blit pads ``indices`` (default: the animating ones) at their current level."""
+        if indices is None:
+            indices = self.animating()
+        level, seq = self.level, self._seq
+        for i in indices:
+            lv = int(level[i])
+            seq.append((self._frame(i, lv)[0], self.bounds(i, lv)))
+        surf.blits(seq, doreturn=False)
+        seq.clear()
+
+    def draw_idle(self, surf):
+        """Every pad at rest – for baking into the background layer."""
+        surf.blits([(self._frame(i, 0)[0], self._rects[i].topleft) for i in range(self.n)], doreturn=False)
+
+    # ---------------- Per-pad info -------------------------------
+    def center(self, i):
+        return self._rects[i].center
+
+    def light_colour(self, i):
+        return self._light[i]
+
+    def light_colours(self):
+        return list(dict.fromkeys(self._light))
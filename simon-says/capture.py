@@ -0,0 +1,171 @@
+"""Offline frame renderer: an input log (or a JSON script) in, video frames out.
+
+The game runs headless on SDL's dummy drivers at a fixed output frame rate.
+The timeline is cut into chunks that a process pool renders in parallel.
+A worker brings its game to a chunk's first frame by running the logic
+alone – every input, pattern step and particle burst, with the game's
+seeded RNGs – which is several hundred times faster than real time.  It
+then draws the chunk, so frame ``n`` is the same whichever worker draws it
+and matches a live run of the same log.  A worker keeps its game between
+chunks and only re-simulates when it is handed an earlier one.
+
+Frames are written as numbered PNGs, or as one raw RGB24 stream for e.g.
+``ffmpeg -f rawvideo -pix_fmt rgb24 -s 800x600 -r 60 -i frames.rgb clip.mp4``.
+
+    python capture.py session.simlog out/ [--format png|raw] [--fps 60] [--workers N]
+    python capture.py script.json out/      # {"seed": 1, "board": null, "inputs": [[ms, x, y], ...]}
+"""
+
+import argparse, json, math, os, shutil, sys, time
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from constants import FPS, LOGIC_HZ
+from inputlog import read_log, REC, IN_CLICK, IN_QUIT
+
+
+def load_inputs(path):
+    """(header, records) from a ``.simlog`` or a JSON script of ``[ms, x, y]`` clicks."""
+    if not path.endswith(".json"):
+        return read_log(path)
+    with open(path) as fh:
+        script = json.load(fh)
+    step_ms = 1000 / LOGIC_HZ
+    recs = np.array([(round(ms / step_ms), IN_CLICK, x, y) for ms, x, y in script["inputs"]], REC)
+    board = script.get("board")
+    return {"hz": LOGIC_HZ, "board": tuple(board) if board else None, "seed": script["seed"]}, recs
+
+
+def frame_count(head, recs, fps, tail_s=1.0) -> int:
+    last = int(recs["tick"].max()) if len(recs) else 0
+    return math.ceil((last * 1000 / head["hz"] + tail_s * 1000) * fps / 1000)
+
+
+# ---------------- Worker -----------------------------------------
+class _Renderer:
+    """One headless game advanced frame by frame on the output clock."""
+    def __init__(self, head, recs, fps):
+        from game import SimonGame
+        from scores import ScoreStore
+        os.environ.pop("SIMON_RECORD", None)
+        self.game = g = SimonGame(board=head["board"], seed=head["seed"], render="surface",
+                                  scores=ScoreStore(":memory:", legacy_json=None))
+        g.ready.wait()
+        g.step.acc = 0.0
+        self.recs  = recs.tolist()
+        self.next  = 0                      # index of the next input to apply
+        self.frame = 0                      # the frame the game state is at
+        self.frame_ms = 1000 / fps
+        self.done  = False                  # a QUIT input was reached
+
+    def _inputs(self):
+        g, recs = self.game, self.recs
+        while self.next < len(recs) and recs[self.next][0] <= g.step.steps:
+            _, kind, x, y = recs[self.next]
+            self.next += 1
+            if kind == IN_CLICK:
+                g._click((x, y), g.step.sim_ms)
+            elif kind == IN_QUIT:
+                self.done = True
+
+    def advance(self, frame):
+        """Run the logic up to ``frame``'s time (inputs on their recorded steps)."""
+        g = self.game
+        step = g.step
+        target = frame * self.frame_ms
+        while not self.done and (step.steps + 1) * step.step_ms <= target + 1e-6:
+            self._inputs()
+            step.acc = step.step_ms
+            g._logic_step()
+        self._inputs()
+        step.acc = max(0.0, target - step.sim_ms)
+        self.frame = frame
+
+    def draw(self, full=False):
+        g = self.game
+        if full:
+            g._overlay_key = None           # first frame of a chunk: composite everything
+        t = g.step.render_ms()
+        g.bank.update(t)
+        g._draw(t, g.step.alpha)
+        return g.screen
+
+
+_worker: dict = {}
+
+def _render_chunk(args):
+    """Render frames [lo, hi) to ``out``; returns (lo, hi, seconds)."""
+    import pygame
+    head, recs, fps, lo, hi, out, fmt = args
+    t0 = time.perf_counter()
+    r = _worker.get("r")
+    if r is None or r.frame > lo:           # start over for an earlier chunk
+        r = _worker["r"] = _Renderer(head, recs, fps)
+    raw = open(os.path.join(out, f".chunk_{lo:08d}.rgb"), "wb") if fmt == "raw" else None
+    try:
+        for f in range(lo, hi):
+            r.advance(f)
+            screen = r.draw(full=f == lo)
+            if raw:
+                raw.write(pygame.surfarray.pixels3d(screen).transpose(1, 0, 2).tobytes())
+            else:
+                pygame.image.save(screen, os.path.join(out, f"frame_{f:06d}.png"))
+    finally:
+        if raw:
+            raw.close()
+    return lo, hi, time.perf_counter() - t0
+
+
+# ---------------- Driver -----------------------------------------
+def render(src, out, fmt="png", fps=FPS, workers=None, chunk=None, frames=None):
+    """Render ``src`` into ``out``; returns (frames, seconds)."""
+    from multiprocessing import Pool
+    head, recs = load_inputs(src)
+    if head["hz"] != LOGIC_HZ:
+        raise ValueError(f"{src} was recorded at {head['hz']} Hz logic, this build runs {LOGIC_HZ} Hz")
+    n = frames or frame_count(head, recs, fps)
+    workers = workers or os.cpu_count() or 1
+    chunk = chunk or max(fps, math.ceil(n / (workers * 4)))
+    os.makedirs(out, exist_ok=True)
+    # each worker takes chunks in timeline order, so it never re-simulates
+    jobs = [(head, recs, fps, lo, min(n, lo + chunk), out, fmt) for lo in range(0, n, chunk)]
+
+    t0 = time.perf_counter()
+    if workers == 1:
+        done = list(map(_render_chunk, jobs))
+    else:
+        with Pool(workers) as pool:
+            done = list(pool.imap(_render_chunk, jobs, chunksize=1))
+            pool.close()                # let the workers exit by themselves: SDL turns
+            pool.join()                 # terminate()'s SIGTERM into a QUIT event
+    if fmt == "raw":
+        with open(os.path.join(out, "frames.rgb"), "wb") as dst:
+            for lo, _, _ in sorted(done):
+                part = os.path.join(out, f".chunk_{lo:08d}.rgb")
+                with open(part, "rb") as fh:
+                    shutil.copyfileobj(fh, dst, 1 << 22)
+                os.remove(part)
+    return n, time.perf_counter() - t0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render an input log or script to frames, in parallel")
+    ap.add_argument("src", help=".simlog input log or .json script")
+    ap.add_argument("out", help="output directory")
+    ap.add_argument("--format", choices=("png", "raw"), default="png")
+    ap.add_argument("--fps", type=int, default=FPS)
+    ap.add_argument("--workers", type=int, help="processes (default: all cores)")
+    ap.add_argument("--chunk", type=int, help="frames per chunk")
+    ap.add_argument("--frames", type=int, help="render only the first N frames")
+    a = ap.parse_args(argv)
+    try:
+        n, dt = render(a.src, a.out, a.format, a.fps, a.workers, a.chunk, a.frames)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f"{n} frames ({n / a.fps:.1f} s of play) in {dt:.2f} s: {n / dt:.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
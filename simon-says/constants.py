@@ -26,3 +26,22 @@ BUTTON_COLOURS = [
 BUTTON_FREQS = [261.63, 311.13, 369.99, 415.30, 493.88, 587.33]  # C4–D#4–F#4–G#4–B4–D5
 
 PLAYER_TIME_MS = 6000  # milliseconds to respond
+
+SHOW_START_MS = 700    # pause before the first flash of a new game
+SHOW_STEP_MS  = 550    # gap between flashes while showing the pattern
+SHOW_ROUND_MS = 900    # pause after a completed round before the next SHOW
+LIGHT_MS      = 450    # flash length while showing
+PRESS_MS      = 300    # flash length for a player press
+
+LOGIC_HZ  = 240        # fixed simulation rate; rendering runs at whatever rate it can
+MAX_STEPS = 12         # logic steps per rendered frame before a render is skipped
+PACING    = "hybrid"   # frame pacing: "sleep", "hybrid" (sleep then spin), "busy" or "off"
+IDLE_TICK_MS = 1000     # heartbeat while idle (nothing animating): the loop blocks in between
+RENDER_BACKEND = "surface"  # "surface" (software display) or "texture" (SDL renderer); SIMON_RENDER overrides
+FAST_INPUT = False      # present a click at once instead of at the next frame slot; SIMON_FAST_INPUT overrides
+
+AUDIO_RATE   = 44100   # mixer sample rate
+AUDIO_BUFFER = 256     # mixer buffer in samples (SIMON_AUDIO_BUFFER overrides); smaller = lower latency
+AUDIO_VOICES = 8       # fixed voice pool, plus reserved channels for sequences and latency probes
+
+STARTUP_BUDGET_MS = 300  # window up to clickable; the stage report prints when exceeded (or SIMON_STARTUP=1)
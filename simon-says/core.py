@@ -0,0 +1,217 @@
+"""Headless Simon rules: state machine, pattern, deadlines and scoring.
+
+No pygame here – time comes from an injected clock (or an explicit ``now``
+in milliseconds) and everything the view needs to react to is reported as
+``(event, button)`` pairs in :attr:`SimonCore.events`.
+"""
+
+import random, time
+from array import array
+from constants import (PLAYER_TIME_MS, SHOW_START_MS, SHOW_STEP_MS, SHOW_ROUND_MS)
+
+START, SHOW, PLAY, GAMEOVER = range(4)
+
+# events reported to the view; EV_SEQUENCE marks a SHOW being scheduled
+EV_SHOW, EV_PRESS, EV_ROUND, EV_FAIL, EV_SEQUENCE = range(5)
+# what an EV_FAIL carries instead of a button
+FAIL_WRONG, FAIL_TIMEOUT = range(2)
+
+
+def monotonic_ms() -> int:
+    return int(time.monotonic() * 1000)
+
+
+# ---------------- Pattern ------------------------------------
+M64 = (1 << 64) - 1
+
+def _mix64(x: int) -> int:
+    """SplitMix64 finaliser: a well-scrambled 64-bit hash of a 64-bit counter."""
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & M64
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & M64
+    return x ^ (x >> 31)
+
+
+class Pattern:
+    """The button sequence of one game, generated on demand.
+
+    Step ``k`` is ``mix64(key + k * golden) % n_buttons`` – a counter-based
+    PRNG – so any step is O(1) and nothing but ``key`` and the length is
+    stored, however long a marathon runs.  Assigning a slice (scripted
+    benchmarks) pins explicit values in a compact ``array``.
+    """
+    GOLDEN = 0x9E3779B97F4A7C15
+
+    __slots__ = ("n_buttons", "key", "_len", "_fixed")
+
+    def __init__(self, n_buttons: int, key: int = 0, length: int = 0):
+        self.n_buttons = n_buttons
+        self.key       = key & M64
+        self._len      = length
+        self._fixed    = None               # array of explicit steps, or None
+
+    def _gen(self, k: int) -> int:
+        return _mix64((self.key + k * self.GOLDEN) & M64) % self.n_buttons
+
+    def step(self, k: int) -> int:
+        return self._gen(k) if self._fixed is None else self._fixed[k]
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self.step(i) for i in range(*k.indices(self._len))]
+        if k < 0:
+            k += self._len
+        if not 0 <= k < self._len:
+            raise IndexError("pattern index out of range")
+        return self.step(k)
+
+    def __iter__(self):
+        return map(self.step, range(self._len))
+
+    def __setitem__(self, k, values):
+        if k != slice(None):
+            raise TypeError("only pattern[:] = values is supported")
+        self._fixed = array("B" if self.n_buttons <= 256 else "H", values)
+        self._len   = len(self._fixed)
+
+    def __repr__(self):
+        return f"Pattern(n_buttons={self.n_buttons}, key={self.key:#x}, length={self._len})"
+
+    def grow(self):
+        """One more step; returns it."""
+        if self._fixed is not None:
+            self._fixed.append(self._gen(self._len))
+        self._len += 1
+        return self.step(self._len - 1)
+
+    def reset(self, key: int):
+        """A fresh, empty sequence drawn from ``key``."""
+        self.key, self._len, self._fixed = key & M64, 0, None
+
+    def fast_forward(self, length: int):
+        """Jump to ``length`` steps in O(1) – the steps need no history."""
+        if self._fixed is not None:
+            raise ValueError("cannot fast-forward a pattern with explicit steps")
+        self._len = length
+
+
+class SimonCore:
+    def __init__(self, n_buttons: int = 6, seed=None, clock=monotonic_ms,
+                 player_time_ms: int = PLAYER_TIME_MS):
+        self.n_buttons      = n_buttons
+        self.rng            = random.Random(seed)
+        self.clock          = clock
+        self.player_time_ms = player_time_ms
+
+        self.state          = START
+        self.pattern        = Pattern(n_buttons)
+        self.player_idx     = 0
+        self.score          = 0
+        self.show_next_ms   = 0
+        self.show_idx       = -1
+        self.deadline_ms    = 0
+        self.play_start_ms  = 0
+        self.round_ms       : list[float] = []   # time taken to repeat each completed round
+        self.events         : list[tuple[int, int]] = []
+
+    def _now(self, now):
+        return self.clock() if now is None else now
+
+    # ---------------- Game flow ------------------------------
+    def _add_step(self):
+        self.pattern.grow()
+
+    def start(self, now=None):
+        now = self._now(now)
+        self.pattern.reset(self.rng.getrandbits(64)); self.score = 0
+        self.round_ms.clear()
+        self._add_step()
+        self.state = SHOW; self.show_idx = -1
+        self.show_next_ms = now + SHOW_START_MS
+        self.events.append((EV_SEQUENCE, -1))
+
+    def resume(self, score: int, key: int | None = None, now=None):
+        """Start straight at the SHOW of round ``score + 1``.
+
+        ``key`` picks the game (``pattern.key`` of an earlier run); the
+        pattern is fast-forwarded, not replayed, so any round costs O(1).
+        """
+        self.start(now)
+        if key is not None:
+            self.pattern.reset(key)
+        self.pattern.fast_forward(score + 1)
+        self.score = score
+
+    def reset(self):
+        self.state = START
+
+    def _fail(self, cause: int):
+        self.state = GAMEOVER
+        self.events.append((EV_FAIL, cause))
+
+    def update(self, now=None):
+        """Advance the SHOW sequence and enforce the PLAY deadline."""
+        now = self._now(now)
+        if self.state == SHOW and now >= self.show_next_ms:
+            self.show_idx += 1
+            if self.show_idx == len(self.pattern):
+                self.state = PLAY; self.player_idx = 0
+                self.play_start_ms = now
+                self.deadline_ms = now + self.player_time_ms
+            else:
+                self.events.append((EV_SHOW, self.pattern[self.show_idx]))
+                self.show_next_ms += SHOW_STEP_MS     # on the grid, never drifting late
+
+        elif self.state == PLAY and now > self.deadline_ms:
+            self._fail(FAIL_TIMEOUT)
+
+    def tap(self, now=None):
+        """A click outside the buttons: starts a game or leaves GAMEOVER."""
+        if self.state == START:
+            self.start(now)
+        elif self.state == GAMEOVER:
+            self.reset()
+
+    def press(self, idx: int, now=None):
+        """Player pressed button ``idx``; ignored outside PLAY."""
+        if self.state != PLAY:
+            self.tap(now)
+            return
+        now = self._now(now)
+        self.events.append((EV_PRESS, idx))
+        if idx == self.pattern[self.player_idx]:
+            # correct
+            self.player_idx += 1
+            self.deadline_ms = now + self.player_time_ms
+            if self.player_idx == len(self.pattern):
+                self.score += 1
+                self.round_ms.append(now - self.play_start_ms)
+                self.events.append((EV_ROUND, idx))
+                self._add_step()
+                self.state = SHOW; self.show_idx = -1
+                self.show_next_ms = now + SHOW_ROUND_MS
+                self.events.append((EV_SEQUENCE, -1))
+        else:
+            self._fail(FAIL_WRONG)
+
+    def show_onsets(self, lo: int = 0, hi: int | None = None):
+        """Lazily, the times at which the pending SHOW flashes its steps ``lo..hi``.
+
+        Counted from the next step to flash; ``hi`` defaults to the last one.
+        """
+        t0, left = self.show_next_ms, len(self.pattern) - self.show_idx - 1
+        return (t0 + k * SHOW_STEP_MS for k in range(lo, left if hi is None else min(hi, left)))
+
+    def show_steps(self, lo: int = 0, hi: int | None = None):
+        """Lazily, the buttons of the same steps as :meth:`show_onsets`."""
+        base, left = self.show_idx + 1, len(self.pattern) - self.show_idx - 1
+        return map(self.pattern.step, range(base + lo, base + (left if hi is None else min(hi, left))))
+
+    def drain(self):
+        """Return and clear the pending events."""
+        if not self.events:                 # the usual case: no new list per step
+            return ()
+        ev, self.events = self.events, []
+        return ev
@@ -1,29 +1,199 @@
-"""Simple particle burst effect for success / failure feedback."""
+"""Simple particle burst effect for success / failure feedback.
 
-import random, pygame
+Particles live in a fixed-capacity struct-of-arrays pool (NumPy) so a whole
+frame is integrated and culled in a handful of vectorised operations, and
+drawn with one ``Surface.blits`` call over pre-rendered circle sprites.
+Particles hidden under a single later one are found in bulk and skipped, so
+a dense swarm costs blits only for what can still be seen.
+"""
+
+import numpy as np, pygame
+
+MAX_SIZE = 8          # largest particle radius with a pre-rendered sprite
+GRAVITY  = 0.05
+OCCLUDE_MIN = 4096    # below this many particles, blitting all beats the occlusion pass
+OCCLUDE_MAX = 1 << 23 # cells of the occlusion grid (radii x bounding box); beyond, blit all
 
 class ParticleSystem:
-    def __init__(self):
-        self.parts = []  # list of dicts
+    def __init__(self, capacity: int = 65536, seed: int | None = None):
+        self.capacity = capacity
+        self.n    = 0                                   # live particles: [0, n)
+        self.pos  = np.zeros((capacity, 2), np.float32)
+        self.prev = np.zeros((capacity, 2), np.float32)  # position one step ago
+        self.vel  = np.zeros((capacity, 2), np.float32)
+        self.life = np.zeros(capacity, np.float32)
+        self.col  = np.zeros(capacity, np.uint8)        # index into self.palette
+        self.size = np.zeros(capacity, np.uint8)
+        self.rng  = np.random.default_rng(seed)
+
+        self.palette: list[tuple[int, int, int]] = []
+        self._col_idx: dict[tuple[int, int, int], int] = {}
+        self._sprites: list[pygame.Surface] = []        # [col * SLOTS + size]
+        self._sprite_arr = np.empty(0, object)           # the same, for gathering by key array
+        self._latest = np.empty(0, np.int32)             # scratch grid of _hidden
+
+    def __len__(self):
+        return self.n
 
+    # ---------------- Sprites ----------------------------------
+    def _colour_index(self, c) -> int:
+        c = tuple(c)
+        idx = self._col_idx.get(c)
+        if idx is None:
+            if len(self.palette) == 256:          # full – reuse the closest colour
+                d = ((np.array(self.palette) - c) ** 2).sum(1)
+                return int(d.argmin())
+            idx = self._col_idx[c] = len(self.palette)
+            self.palette.append(c)
+            self._sprites.extend(self._render_sprites(c))
+        return idx
+
+    @staticmethod
+    def _render_sprites(c):
+        key = (255, 0, 255) if c == (0, 0, 0) else (0, 0, 0)
+        sprites = []
+        for s in range(MAX_SIZE + 1):
+            surf = pygame.Surface((max(1, 2*s), max(1, 2*s)))
+            surf.fill(key)
+            pygame.draw.circle(surf, c, (s, s), s)
+            surf.set_colorkey(key, pygame.RLEACCEL)
+            sprites.append(surf)
+        return sprites
+
+    # ---------------- Simulation -------------------------------
     def burst(self, x, y, colours, n=120):
-        for _ in range(n):
-            self.parts.append({
-                'x': x, 'y': y,
-                'vx': random.uniform(-4,4), 'vy': random.uniform(-4,4),
-                'life': random.randint(30, 65),
-                'c': random.choice(colours),
-                's': random.randint(2, 5)
-            })
-
-    def update(self):
-        for p in self.parts[:]:
-            p['x'] += p['vx']; p['y'] += p['vy']
-            p['vy'] += 0.05  # gravity
-            p['life'] -= 1
-            if p['life'] <= 0:
-                self.parts.remove(p)
-
-    def draw(self, surf):
-        for p in self.parts:
-            pygame.draw.circle(surf, p['c'], (int(p['x']), int(p['y'])), p['s'])
+        n = min(n, self.capacity - self.n)
+        if n <= 0:
+            return
+        lo, hi = self.n, self.n + n
+        rng = self.rng
+        self.pos[lo:hi] = self.prev[lo:hi] = (x, y)
+        self.vel[lo:hi] = rng.uniform(-4, 4, (n, 2))
+        self.life[lo:hi] = rng.integers(30, 66, n)
+        idx = np.fromiter((self._colour_index(c) for c in colours), np.uint8)
+        self.col[lo:hi] = idx[rng.integers(0, idx.size, n)]
+        self.size[lo:hi] = rng.integers(2, 6, n)
+        self.n = hi
+
+    def update(self, dt: float = 1.0):
+        """Advance by ``dt`` steps of 1/60 s (velocities are per 60 Hz frame)."""
+        n = self.n
+        if not n:
+            return
+        pos, vel, life = self.pos[:n], self.vel[:n], self.life[:n]
+        self.prev[:n] = pos
+        pos += vel if dt == 1.0 else vel * np.float32(dt)
+        vel[:, 1] += GRAVITY * dt
+        life -= dt
+        dead = np.flatnonzero(life <= 0)
+        if dead.size:
+            self._swap_remove(dead)
+
+    def _swap_remove(self, dead: np.ndarray):
+        """Fill each dead slot below the new end with a live particle from the tail."""
+        new_n = self.n - dead.size
+        holes = dead[dead < new_n]
+        if holes.size:
+            tail = np.arange(new_n, self.n)
+            tail = tail[self.life[new_n:self.n] > 0]
+            for a in (self.pos, self.prev, self.vel, self.life, self.col, self.size):
+                a[holes] = a[tail]
+        self.n = new_n
+
+    def clear(self):
+        self.n = 0
+
+    def bounds(self) -> pygame.Rect | None:
+        """Bounding rect of every live particle, or None when empty."""
+        if not self.n:
+            return None
+        pos, prev = self.pos[:self.n], self.prev[:self.n]
+        (x0, y0) = np.minimum(pos.min(0), prev.min(0))
+        (x1, y1) = np.maximum(pos.max(0), prev.max(0))
+        return pygame.Rect(int(x0) - MAX_SIZE, int(y0) - MAX_SIZE,
+                           int(x1 - x0) + 2*MAX_SIZE + 2, int(y1 - y0) + 2*MAX_SIZE + 2)
+
+    # ---------------- Rendering --------------------------------
+    def draw(self, surf, alpha: float = 1.0, clip: pygame.Rect | None = None):
+        """Blit every particle; ``alpha`` interpolates between the last two steps.
+
+        Particles entirely outside ``clip`` (e.g. the screen) are not blitted,
+        nor, in a large swarm, those hidden under later ones (:meth:`_hidden`).
+        """
+        n = self.n
+        if not n:
+            return
+        size = self.size[:n]
+        pos = self.pos[:n]
+        if alpha != 1.0:
+            pos = self.prev[:n] + (pos - self.prev[:n]) * np.float32(alpha)
+        xy = (pos - size[:, None]).astype(np.int32)
+        x, y, col = xy[:, 0], xy[:, 1], self.col[:n]
+        if clip is not None:
+            d = 2 * size.astype(np.int32)
+            on = (x < clip.right) & (y < clip.bottom) & (x + d > clip.x) & (y + d > clip.y)
+            if not on.all():
+                x, y, col, size = x[on], y[on], col[on], size[on]
+        if x.size >= OCCLUDE_MIN:
+            seen = np.flatnonzero(~self._hidden(x, y, size))
+            x, y, col, size = x.take(seen), y.take(seen), col.take(seen), size.take(seen)
+        keys = col.astype(np.intp) * (MAX_SIZE + 1) + size
+        if len(self._sprite_arr) != len(self._sprites):
+            self._sprite_arr = np.empty(len(self._sprites), object)
+            self._sprite_arr[:] = self._sprites
+        dests = zip(x.tolist(), y.tolist())
+        surf.blits(zip(self._sprite_arr[keys].tolist(), dests), doreturn=False)
+
+    # ---------------- Occlusion --------------------------------
+    _cover = None       # [(radius needed per radius, [centre offsets])], shared by all systems
+
+    @classmethod
+    def _cover_groups(cls):
+        """For centre offsets of up to one pixel: the radius a disc there needs to
+        cover a disc of each radius, read off the sprite masks; offsets that need
+        the same radii are grouped."""
+        if cls._cover is None:
+            masks = [pygame.mask.from_surface(s) for s in cls._render_sprites((255, 255, 255))]
+            groups = {}
+            for ey in (-1, 0, 1):
+                for ex in (-1, 0, 1):
+                    need = [next((t for t in range(s, MAX_SIZE + 1)
+                                  if masks[t].overlap_area(m, (t - s - ex, t - s - ey)) == m.count()),
+                                 MAX_SIZE + 1) for s, m in enumerate(masks)]
+                    groups.setdefault(tuple(need), []).append((ex, ey))
+            cls._cover = [(np.array(need, np.intp), offs) for need, offs in groups.items()]
+        return cls._cover
+
+    def _hidden(self, x, y, size) -> np.ndarray:
+        """Particles fully covered by one drawn after them, centred at most a pixel away.
+
+        ``latest[t][p]`` is the last particle centred on pixel ``p`` with radius
+        >= t; particle i is hidden when, at some offset, that is later than i
+        for the radius needed to cover it.  Skipping them leaves the frame
+        pixel-identical.
+        """
+        n = x.size
+        s = size.astype(np.intp)
+        cx, cy = x + s, y + s
+        x0, y0 = int(cx.min()) - 1, int(cy.min()) - 1
+        w, h = int(cx.max()) - x0 + 2, int(cy.max()) - y0 + 2
+        lin = (cy - y0) * w + (cx - x0)
+        lo, hi = int(s.min()), int(s.max())
+        cells = (hi - lo + 2) * w * h
+        if cells > OCCLUDE_MAX:             # swarm spread too far for a dense grid
+            return np.zeros(n, bool)
+        if self._latest.size < cells:
+            self._latest = np.empty(cells, np.int32)
+        flat = self._latest[:cells]
+        latest = flat.reshape(hi - lo + 2, w * h)
+        flat.fill(-1)
+        idx = np.arange(n, dtype=np.int32)
+        np.maximum.at(flat, (s - lo) * (w * h) + lin, idx)       # radius exactly t ...
+        for t in range(hi - lo - 1, -1, -1):                   # ... then radius >= t
+            np.maximum(latest[t], latest[t + 1], out=latest[t])
+        last = np.full(n, -1, np.int32)
+        for need, offs in self._cover_groups():
+            base = (np.minimum(need[s], hi + 1) - lo) * (w * h) + lin
+            for ex, ey in offs:
+                np.maximum(last, flat.take(base + (ey * w + ex)), out=last)
+        return last > idx
@@ -1,178 +1,424 @@
 """Main game logic and state management for Simon Says Pro."""
 
-import pygame, random, json, pathlib
+import os, sys, pygame, threading, time
 from constants import *
-from button import Button
-from audio import make_tone
+import core
+from core import SimonCore, EV_SHOW, EV_PRESS, EV_ROUND, EV_FAIL, EV_SEQUENCE, FAIL_TIMEOUT
+from buttonbank import ButtonBank, hex_layout, grid_layout, palette
+from audio import ToneBank, AudioEngine, PRIO_UI, pre_init
 from effects import ParticleSystem
+from textcache import TextCache
+from profiler import FrameProfiler, AllocProfiler, InputLatency, STATE, AUDIO
+from timing import FixedStep, Pacer, StageTimer
+from scores import ScoreStore
+from inputlog import InputLog
+from telemetry import Telemetry
+from render import make_backend, DirtyRects
+
+IDLE_TICK = pygame.event.custom_type()     # heartbeat that bounds an idle wait
 
 class SimonGame:
-    START, SHOW, PLAY, GAMEOVER = range(4)
-
-    def __init__(self):
-        pygame.mixer.pre_init(44100, -16, 2, 512)
-        pygame.init()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("Simon Says Pro")
-        self.clock = pygame.time.Clock()
-
-        # Fonts
-        self.font_big   = pygame.font.SysFont(None, 80, bold=True)
-        self.font_med   = pygame.font.SysFont(None, 48)
-        self.font_small = pygame.font.SysFont(None, 30)
-
-        # Buttons layout – hexagon style (3 rows)
-        offs = BTN_SIZE + MARGIN
-        layout = [
-            (-offs/2, -offs*1.2), (offs/2, -offs*1.2),  # row 1 (2)
-            (-offs,     0),       (offs,     0),        # row 2 (2)
-            (-offs/2,  offs*1.2), (offs/2,  offs*1.2)   # row 3 (2)
-        ]
-        self.buttons: list[Button] = []
-        for i, (dx, dy) in enumerate(layout):
-            rect = pygame.Rect(0,0, BTN_SIZE, BTN_SIZE)
-            rect.center = (CENTER_X + dx, CENTER_Y + dy)
-            dark, light = BUTTON_COLOURS[i]
-            tone = make_tone(BUTTON_FREQS[i])
-            self.buttons.append(Button(rect, dark, light, tone))
-
-        # Game vars
-        self.state          = self.START
-        self.pattern        : list[int] = []
-        self.player_idx     = 0
-        self.score          = 0
-        self.best           = self._load_best()
-        self.show_next_ms   = 0
-        self.show_idx       = -1
-        self.deadline_ms    = 0
-
-        # Sounds
-        self.s_success = make_tone(880, .18)
-        self.s_fail    = make_tone(120, .8)
-
-        # Particles
-        self.fx = ParticleSystem()
-
-    # ---------------- Best score persistence -----------------
-    def _load_best(self):
-        f = pathlib.Path('simon_score.json')
-        if f.exists():
+    START, SHOW, PLAY, GAMEOVER = core.START, core.SHOW, core.PLAY, core.GAMEOVER
+
+    def __init__(self, fps: float = FPS, pacing: str = PACING, board: tuple[int, int] | None = None,
+                 seed: int | None = None, scores: ScoreStore | None = None,
+                 render: str | None = None, fast_input: bool | None = None):
+        # Staged startup: window and a splash first, fonts/tones/scores on a worker
+        self.boot  = StageTimer()
+        self.ready = threading.Event()      # set once the worker has loaded everything
+        self._boot_error = None
+        with self.boot.stage("display"):
+            buffer = pre_init()
+            pygame.display.init()
+            pygame.font.init()
+            # "surface" or "texture" (SIMON_RENDER); see render.py
+            self.gfx    = make_backend(render, (WIDTH, HEIGHT), "Simon Says Pro")
+            self.screen = getattr(self.gfx, "screen", None)
+
+        with self.boot.stage("board"):
+            # Logic runs on a fixed step; rendering is paced separately
+            self.step  = FixedStep()
+            self.pacer = Pacer(fps, pacing)
+            self.fx_dt = self.step.step_ms * FPS / 1000
+
+            # One seed drives the pattern and the particles, so a run can be replayed
+            self.seed  = int.from_bytes(os.urandom(8), "little") if seed is None else seed
+            self.board = board
+
+            # Board – the classic hexagon, or a cols x rows grid for the advanced tier
+            rects = hex_layout() if board is None else grid_layout(*board)
+            self.bank = ButtonBank(rects, palette(len(rects)))
+
+            # Game rules run headless; this class only renders and plays sound
+            self.core = SimonCore(self.bank.n, seed=self.seed, clock=lambda: self.step.sim_ms)
+            self.fx   = ParticleSystem(seed=self.seed)
+
+            # Render layers – static background is composited once
+            self.screen_rect = pygame.Rect(0, 0, WIDTH, HEIGHT)
+            self._full_frame = [self.screen_rect]
+            # timer bar: its rects and colour are updated in place every frame
+            self._bar        = pygame.Rect(CENTER_X-160, HEIGHT-45, 320, 18)
+            self._bar_fill   = self._bar.copy()
+            self._bar_colour = pygame.Color(0, 0, 0)
+            self._bg = self._build_background()
+            self._overlay = None
+            self._overlay_key = None
+            self._dirty = DirtyRects()
+
+        with self.boot.stage("splash"):
+            # built once, before the worker starts: the main thread opens no font while it loads
+            self._splash = self._build_splash()
+            self._overlay, self._overlay_key = self._splash, (False,)
+            self.gfx.blit(self._bg, (0, 0))
+            self.gfx.blit(self._overlay, (0, 0))
+            self.gfx.present([self.screen_rect])
+        self.boot.mark("first frame")
+
+        with self.boot.stage("mixer"):
             try:
-                return json.loads(f.read_text())['best']
-            except: pass
-        return 0
-    def _save_best(self):
-        pathlib.Path('simon_score.json').write_text(json.dumps({'best': self.best}))
+                pygame.mixer.init()
+            except pygame.error:            # no audio device – play silently
+                pass
+            self.audio  = AudioEngine(buffer=buffer)
+        # Tones are cached on disk and synthesised in the background when missing;
+        # the score store opens its database on its own thread
+        self.tones  = ToneBank()
+        # every board size keeps its own leaderboard: "classic" or "grid<cols>x<rows>"
+        self.mode   = "classic" if board is None else f"grid{board[0]}x{board[1]}"
+        self.scores = ScoreStore(mode=self.mode) if scores is None else scores
+
+        # Frame-phase profiler (SIMON_PROFILE=1 / path.csv / path.json, F3 overlay);
+        # SIMON_ALLOC (same values) also counts allocations and GC pauses per phase
+        self.prof = AllocProfiler.from_env()
+        # Input log for replays (SIMON_RECORD=path)
+        self.log  = InputLog.from_env(self.seed, board, LOGIC_HZ)
+        # Click latency probe (SIMON_LATENCY=1 / path.csv)
+        self.lat  = InputLatency.from_env()
+        # Gameplay telemetry for tuning (SIMON_TELEMETRY=dir; analyse with telemetry.py)
+        self.tm   = Telemetry.from_env(self.seed, self.bank.n)
+        self.idle_wakes = 0
 
-    # ---------------- Game flow helpers ----------------------
-    def _add_step(self):
-        self.pattern.append(random.randrange(len(self.buttons)))
+        # Input is stamped when first seen: (logic ms, wall ms, event)
+        self._inbox: list[tuple[float, float, pygame.event.Event]] = []
+        if fast_input is None:
+            fast_input = os.environ.get("SIMON_FAST_INPUT", "1" if FAST_INPUT else "0") != "0"
+        self.fast_input = fast_input
+        self.running    = False
+        self._probed    = False             # output latency is measured once assets are in
+
+        self._assets = threading.Thread(target=self._load_assets, name="assets", daemon=True)
+        self._assets.start()
+
+    def _load_assets(self):
+        """Worker: fonts, tones and the best score, then :attr:`ready`; joined by :meth:`close`.
+
+        Nothing here touches the mixer after :attr:`ready` is set.
+        """
+        boot = self.boot
+        try:
+            with boot.stage("fonts"):
+                self.font_big   = pygame.font.SysFont(None, 80, bold=True)
+                self.font_med   = pygame.font.SysFont(None, 48)
+                self.font_small = pygame.font.SysFont(None, 30)
+                self.text       = TextCache()
+            with boot.stage("tones"):
+                self.pad_tones = [self.tones.tone(BUTTON_FREQS[i % len(BUTTON_FREQS)])
+                                  for i in range(self.bank.n)]
+                self.s_success = self.tones.tone(880, .18)
+                self.s_fail    = self.tones.tone(120, .8)
+                self.tones.wait()
+            with boot.stage("scores"):
+                self.scores.wait()
+        except Exception as e:              # re-raised on the main thread
+            self._boot_error = e
+        boot.mark("ready")
+        self.ready.set()
+        if os.environ.get("SIMON_STARTUP") or boot.over_budget:
+            print("startup stages:\n" + boot.report(), file=sys.stderr)
+
+    # ---------------- Game state (owned by the core) --------
+    state       = property(lambda self: self.core.state)
+    score       = property(lambda self: self.core.score)
+    pattern     = property(lambda self: self.core.pattern)
+    deadline_ms = property(lambda self: self.core.deadline_ms)
+    best        = property(lambda self: self.scores.best_for(self.mode))
 
     def start(self):
-        self.pattern.clear(); self.score = 0
-        self._add_step()
-        self.state = self.SHOW; self.show_idx = -1
-        self.show_next_ms = pygame.time.get_ticks() + 700
-
-    def _fail(self):
-        self.state = self.GAMEOVER
-        if self.s_fail: self.s_fail.play()
-        self.fx.burst(CENTER_X, CENTER_Y, [b.light_c for b in self.buttons], 180)
-        self.best = max(self.best, self.score)
-        self._save_best()
+        self.core.start()
+
+    def _fail(self, cause=FAIL_TIMEOUT):
+        self.tm.fail(self.step.sim_ms, len(self.pattern), self.core.player_idx, cause)
+        self.audio.play(self.s_fail, PRIO_UI)
+        self.fx.burst(CENTER_X, CENTER_Y, self.bank.light_colours()[:32], 180)
+        self.scores.record(self.score, self.core.round_ms, mode=self.mode)
+
+    def _react(self, now):
+        """Turn core events into flashes, sounds and particles."""
+        for ev, idx in self.core.drain():
+            if ev == EV_SHOW:                   # its tone is already scheduled
+                self.bank.light_up(idx, now, LIGHT_MS)
+            elif ev == EV_SEQUENCE:
+                self._schedule_show(now)
+            elif ev == EV_PRESS:
+                self.bank.light_up(idx, now, PRESS_MS)
+                self.audio.play(self.pad_tones[idx], fade_ms=25)
+                self.lat.mark(AUDIO)
+            elif ev == EV_ROUND:
+                self.tm.round(now, self.score, self.core.round_ms[-1])
+                self.audio.play(self.s_success, PRIO_UI)
+                self.fx.burst(*self.bank.center(idx), [self.bank.light_colour(idx)], 80)
+            elif ev == EV_FAIL:
+                self._fail(idx)
+
+    def _schedule_show(self, now):
+        """Hand the coming SHOW to the sequence channel; steps are pulled as it plays."""
+        c, tones = self.core, self.pad_tones
+        self.audio.schedule((tones[i] for i in c.show_steps()), (t - now for t in c.show_onsets()))
 
     # ---------------- Main loop ------------------------------
     def run(self):
-        running=True
-        while running:
-            now = pygame.time.get_ticks()
-            for ev in pygame.event.get():
-                if ev.type == pygame.QUIT:
-                    running=False
-                elif ev.type == pygame.MOUSEBUTTONDOWN and ev.button==1:
-                    self._click(ev.pos, now)
-
-            # state updates
-            if self.state == self.SHOW and now >= self.show_next_ms:
-                self.show_idx += 1
-                if self.show_idx == len(self.pattern):
-                    self.state = self.PLAY; self.player_idx = 0
-                    self.deadline_ms = now + PLAYER_TIME_MS
-                else:
-                    idx = self.pattern[self.show_idx]
-                    self.buttons[idx].light_up(now)
-                    self.show_next_ms = now + 550
-
-            elif self.state == self.PLAY and now > self.deadline_ms:
-                self._fail()
-
-            for b in self.buttons:
-                b.update(now)
-            self.fx.update()
-
-            # draw
-            self._draw(now)
-            pygame.display.flip()
-            self.clock.tick(FPS)
+        step = self.step
+        self.running = True
+        pygame.time.set_timer(IDLE_TICK, IDLE_TICK_MS)
+        while self.running:
+            prof = self.prof
+            prof.begin()
+            if self._idle():
+                self._wait_idle()
+                prof.mark(5)
+            else:
+                self._poll()
+            t_frame = time.perf_counter()
+            steps = step.advance(time.perf_counter() * 1000)
+            if self._boot_error:
+                raise self._boot_error
+            prof.mark(0)
+
+            # fixed-step state updates and particle physics; input is applied
+            # in between, on the step it arrived in
+            for _ in range(steps):
+                self._apply_input()
+                self._logic_step()
+            self._apply_input()
+            if not self._probed and self.ready.is_set():
+                self._probed = True
+                self.audio.start_probe()    # advanced by pump() over the next frames
+            self.audio.pump()
+            if step.behind:             # catch up on logic before drawing again
+                step.dropped += 1
+                prof.end()
+                continue
+
+            self._present()
+            self.pacer.wait(self._poll)
+            prof.mark(5)
+            prof.end()
+            self.tm.frame((time.perf_counter() - t_frame) * 1000, step.dropped)
+        self.close()
+
+    def _idle(self) -> bool:
+        """Nothing can change without input: no SHOW, no deadline, nothing animating."""
+        return (self.ready.is_set() and not self._inbox and self.state in (self.START, self.GAMEOVER)
+                and not self._dirty.prev and not len(self.fx) and not self.bank.animating()
+                and not self.prof.visible and not self.audio.probing)
+
+    def _wait_idle(self):
+        """Block until an event (at worst the IDLE_TICK heartbeat); logic time is paused."""
+        events = [pygame.event.wait()]
+        events += pygame.event.get()
+        self.idle_wakes += 1
+        self.step.skip(time.perf_counter() * 1000)
+        self.pacer.reset()
+        self._stamp(events)
+
+    # ---------------- Input ----------------------------------
+    def _stamp(self, events):
+        wall = time.perf_counter() * 1000
+        sim  = self.step.sim_at(wall)
+        self._inbox += [(sim, wall, ev) for ev in events]
+
+    def _poll(self) -> bool:
+        """Stamp pending events; True ends the pacer's wait (a click on the fast path)."""
+        events = pygame.event.get()
+        if not events:
+            return False
+        self._stamp(events)
+        return self.fast_input and any(ev.type == pygame.MOUSEBUTTONDOWN for ev in events)
+
+    def _apply_input(self):
+        """Apply the input that arrived before the end of the coming step.
+
+        It is judged at the current logic time, never later than its
+        arrival, so a tap made before the deadline always counts however
+        late the frame that sees it.
+        """
+        step, inbox = self.step, self._inbox
+        limit = step.sim_ms + step.step_ms
+        n = 0
+        while n < len(inbox) and inbox[n][0] < limit:
+            n += 1
+        if not n:
+            return
+        due, self._inbox = inbox[:n], inbox[n:]
+        now = step.sim_ms
+        for _, wall, ev in due:
+            if ev.type == pygame.QUIT:
+                self.log.quit(step.steps)
+                self.running = False
+            elif ev.type == pygame.MOUSEBUTTONDOWN and ev.button==1 and self.ready.is_set():
+                self.lat.arrive(wall)
+                self.log.click(step.steps, ev.pos)
+                self._click(ev.pos, now)
+            elif ev.type == pygame.KEYDOWN and ev.key == pygame.K_F3:
+                self._toggle_profiler()
+
+    def _logic_step(self):
+        """One fixed step: rules, their sounds and flashes, particle physics."""
+        now = self.step.tick()
+        self.core.update(now)
+        self._react(now)
+        self.prof.mark(1)
+        self.fx.update(self.fx_dt)
+        self.prof.mark(2)
+
+    def _present(self):
+        """Draw the state interpolated between the last two steps and flip."""
+        t = self.step.render_ms()
+        self.bank.update(t)
+        self.prof.mark(1)
+        rects = self._draw(t, self.step.alpha)
+        self.prof.mark(3)
+        self.gfx.present(rects)
+        self.lat.presented()
+        self.prof.mark(4)
+
+    def close(self):
+        self._assets.join()                 # it may still be loading tones with the mixer
+        self.log.close()
+        self.prof.export()
+        self.lat.export()
+        self.tm.close()
+        if self.lat.enabled:
+            print("input latency:\n" + self.lat.report(), file=sys.stderr)
+        if self.prof.alloc:
+            print("allocations:\n" + self.prof.report(), file=sys.stderr)
+            self.prof.stop()
+        self.audio.close()
+        self.scores.close()
+        self.tones.close()
         pygame.quit()
 
+    def _toggle_profiler(self):
+        if not self.prof.enabled:
+            self.prof = FrameProfiler()
+        self.prof.visible = not self.prof.visible
+
     # ---------------- Input handling -------------------------
     def _click(self, pos, now):
-        if self.state == self.START:
-            self.start(); return
-        if self.state == self.GAMEOVER:
-            self.state = self.START; return
         if self.state != self.PLAY:
-            return
-        for idx, b in enumerate(self.buttons):
-            if b.collide(pos):
-                b.light_up(now, 300)
-                if idx == self.pattern[self.player_idx]:
-                    # correct
-                    self.player_idx += 1
-                    self.deadline_ms = now + PLAYER_TIME_MS
-                    if self.player_idx == len(self.pattern):
-                        self.score += 1
-                        if self.s_success: self.s_success.play()
-                        self.fx.burst(*b.rect.center, [b.light_c], 80)
-                        self._add_step()
-                        self.state = self.SHOW; self.show_idx = -1
-                        self.show_next_ms = now + 900
-                else:
-                    self._fail()
-                break
+            self.core.tap(now); self.lat.mark(STATE); return
+        idx = self.bank.hit(pos)
+        if idx >= 0:
+            c = self.core
+            k = c.player_idx                # reaction: since the SHOW ended or the last press
+            self.tm.click(now, len(c.pattern), k, idx, now - (c.deadline_ms - c.player_time_ms),
+                          idx == c.pattern[k])
+            c.press(idx, now)
+            self.lat.mark(STATE)
+        self._react(now)
 
     # ---------------- Drawing --------------------------------
-    def _draw(self, now):
-        self.screen.fill((18,18,18))
+    def _build_background(self):
+        bg = self.gfx.convert(pygame.Surface((WIDTH, HEIGHT)))
+        bg.fill((18,18,18))
         # subtle bg gradient
         for y in range(0, HEIGHT, 3):
             shade = 18 + y*4//HEIGHT
-            pygame.draw.line(self.screen,(shade,shade,shade),(0,y),(WIDTH,y))
+            pygame.draw.line(bg,(shade,shade,shade),(0,y),(WIDTH,y))
+        # idle button faces
+        self.bank.draw_idle(bg)
+        return bg
 
-        for b in self.buttons:
-            b.draw(self.screen)
-        self.fx.draw(self.screen)
+    def _build_splash(self):
+        """START screen shown while assets load – default font only, no font lookup."""
+        ov = self.gfx.convert(pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA), alpha=True)
+        big = pygame.font.Font(None, 80); big.set_bold(True)
+        for txt, font, y_off in (("SIMON SAYS PRO", big, -160),
+                                 ("Loading…", pygame.font.Font(None, 30), -60)):
+            t = font.render(txt, True, WHITE)
+            ov.blit(t, (CENTER_X - t.get_width()//2, CENTER_Y + y_off))
+        return ov
 
+    def _build_overlay(self):
+        """Text layer for the current state; rebuilt only when its content changes."""
+        if not self.ready.is_set():
+            return self._splash
+        ov = self.gfx.convert(pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA), alpha=True)
         if self.state == self.START:
-            self._text_center("SIMON SAYS PRO", self.font_big, WHITE, -160)
-            self._text_center("Click to start", self.font_med, WHITE, -60)
-            self._text_center(f"High score: {self.best}", self.font_small, WHITE, 40)
+            self._text_center("SIMON SAYS PRO", self.font_big, WHITE, -160, ov)
+            self._text_center("Click to start", self.font_med, WHITE, -60, ov)
+            self._number_center("High score: ", self.best, self.font_small, WHITE, 40, ov)
         elif self.state == self.SHOW:
-            self._text_center("Watch the pattern…", self.font_med, WHITE, -280)
-        elif self.state == self.PLAY:
-            rem = max(0, self.deadline_ms - now); bar = rem/PLAYER_TIME_MS
-            pygame.draw.rect(self.screen, (50,50,50), (CENTER_X-160, HEIGHT-45, 320, 18), border_radius=9)
-            pygame.draw.rect(self.screen, (255*(1-bar),255*bar,0), (CENTER_X-160, HEIGHT-45, int(320*bar), 18), border_radius=9)
+            self._text_center("Watch the pattern…", self.font_med, WHITE, -280, ov)
         elif self.state == self.GAMEOVER:
-            self._text_center("Game Over", self.font_big, RED, -130)
-            self._text_center(f"Score: {self.score}", self.font_med, WHITE, -40)
-            self._text_center("Click to play again", self.font_small, WHITE, 50)
+            self._text_center("Game Over", self.font_big, RED, -130, ov)
+            self._number_center("Score: ", self.score, self.font_med, WHITE, -40, ov)
+            self._text_center("Click to play again", self.font_small, WHITE, 50, ov)
 
         if self.state in (self.PLAY, self.SHOW):
-            s_txt = self.font_small.render(f"Score: {self.score}", True, WHITE)
-            self.screen.blit(s_txt, (20,20))
+            self.text.blit_number(ov, self.font_small, "Score: ", self.score, WHITE, (20,20))
+        return ov
+
+    def _draw(self, now, alpha=1.0):
+        """Redraw only what changed; returns the rects to push to the display."""
+        # while loading the splash never changes, whatever the score writer reports as best
+        key = (True, self.state, self.score, self.best) if self.ready.is_set() else (False,)
+        full = key != self._overlay_key
+        if full:
+            self._overlay, self._overlay_key = self._build_overlay(), key
+
+        lit, dirty, bar = self.bank.animating(), self._dirty, self._bar
+        for i in lit:
+            dirty.add(self.bank.bounds(i))
+        fx_rect = self.fx.bounds()
+        if fx_rect:
+            dirty.add(fx_rect.clip(self.screen_rect))
+        if self.state == self.PLAY:
+            dirty.add(bar)
+        if self.prof.visible:
+            dirty.add(self.prof.rect)
+
+        gfx = self.gfx
+        regions = dirty.merge()
+        if full or not gfx.partial:             # a texture renderer redraws everything
+            regions = self._full_frame
+
+        for r in regions:
+            gfx.blit(self._bg, r, r)
+        self.bank.draw(gfx, lit)
+        self.fx.draw(gfx, alpha, self.screen_rect)
+        for r in regions:
+            gfx.blit(self._overlay, r, r)
+
+        if self.state == self.PLAY:
+            rem = max(0, self.deadline_ms - now); frac = rem/PLAYER_TIME_MS
+            gfx.rect((50,50,50), bar, border_radius=9)
+            fill, colour = self._bar_fill, self._bar_colour
+            fill.w = int(320*frac)
+            colour.r, colour.g = int(255*(1-frac)), int(255*frac)
+            gfx.rect(colour, fill, border_radius=9)
+        if self.prof.visible:
+            gfx.blit(self.prof.render(), self.prof.rect, dynamic=True)
+        return regions
+
+    def _text_center(self, txt, font, col, y_off=0, surf=None):
+        if surf is None:
+            surf = self.screen
+        t = self.text.render(font, txt, col)
+        surf.blit(t, (CENTER_X - t.get_width()//2, CENTER_Y + y_off))
 
-    def _text_center(self, txt, font, col, y_off=0):
-        surf = font.render(txt, True, col)
-        self.screen.blit(surf, (CENTER_X - surf.get_width()//2, CENTER_Y + y_off))
+    def _number_center(self, prefix, value, font, col, y_off=0, surf=None):
+        if surf is None:
+            surf = self.screen
+        w, _ = self.text.number_size(font, prefix, value, col)
+        self.text.blit_number(surf, font, prefix, value, col, (CENTER_X - w//2, CENTER_Y + y_off))
@@ -0,0 +1,73 @@
+"""Compact binary input log for reproducing sessions.
+
+A log is a 24-byte header (magic, logic rate, board, RNG seed) followed by
+append-only 9-byte records ``(tick, type, x, y)``; ``tick`` is the logic
+step the input was applied on, so a replay through the fixed-step loop is
+exact.  Records are collected in a NumPy array and written out a block at
+a time.  ``SIMON_RECORD=session.simlog`` turns recording on.
+"""
+
+import os, struct
+import numpy as np
+
+MAGIC  = b"SIMNLOG\x02"            # v2: counter-based patterns (core.Pattern)
+HEADER = struct.Struct("<8sHHHHQ")      # magic, logic hz, cols, rows, reserved, seed
+
+REC = np.dtype([("tick", "<u4"), ("type", "u1"), ("x", "<i2"), ("y", "<i2")])
+IN_CLICK, IN_QUIT = 1, 2
+
+
+class NullLog:
+    def click(self, tick, pos): pass
+    def quit(self, tick): pass
+    def close(self): pass
+
+
+class InputLog:
+    def __init__(self, path, seed: int, board=None, hz: int = 240, block: int = 4096):
+        self.path  = path
+        self._fh   = open(path, "wb")
+        self._fh.write(HEADER.pack(MAGIC, hz, *(board or (0, 0)), 0, seed))
+        self._buf  = np.zeros(block, REC)
+        self._n    = 0
+        self.count = 0
+
+    @classmethod
+    def from_env(cls, seed, board=None, hz: int = 240, var="SIMON_RECORD"):
+        path = os.environ.get(var, "")
+        return cls(path, seed, board, hz) if path else NullLog()
+
+    def _append(self, tick, kind, x=0, y=0):
+        self._buf[self._n] = (tick, kind, x, y)
+        self._n += 1; self.count += 1
+        if self._n == len(self._buf):
+            self.flush()
+
+    def click(self, tick: int, pos):
+        self._append(tick, IN_CLICK, *pos)
+
+    def quit(self, tick: int):
+        self._append(tick, IN_QUIT)
+
+    def flush(self):
+        self._fh.write(self._buf[:self._n].tobytes())
+        self._n = 0
+
+    def close(self):
+        if not self._fh.closed:
+            self.flush()
+            self._fh.close()
+
+
+def read_log(path):
+    """Return (header dict, records array); a torn final record is ignored."""
+    with open(path, "rb") as fh:
+        data = fh.read()
+    magic, hz, cols, rows, _, seed = HEADER.unpack_from(data)
+    if magic[:7] != MAGIC[:7]:
+        raise ValueError(f"{path}: not a Simon input log")
+    if magic != MAGIC:
+        raise ValueError(f"{path}: input log version {magic[7]}, this build replays {MAGIC[7]}")
+    body = data[HEADER.size:]
+    recs = np.frombuffer(body[:len(body) - len(body) % REC.itemsize], REC)
+    return {"hz": hz, "board": (cols, rows) if cols else None, "seed": seed}, recs
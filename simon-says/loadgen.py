@@ -0,0 +1,154 @@
+"""Load generator for server.py.
+
+Opens ``--clients`` concurrent simulated players.  Each one plays
+``--games`` games on its connection, repeating the pattern correctly for
+``--rounds`` rounds and then pressing a wrong button; connections are
+spread over ``--ramp`` seconds.  Reports finished sessions per second,
+command→response latency percentiles, and the server's resident memory
+per open session.
+
+By default a server is started in a subprocess on a free port; pass
+``--port`` to load an already running one.
+
+    python loadgen.py --clients 2000 --rounds 2
+"""
+
+import argparse, asyncio, os, random, sys, time
+import numpy as np
+from server import raise_fd_limit
+
+
+class Stats:
+    def __init__(self):
+        self.lat      = []                  # seconds per command
+        self.sessions = 0
+        self.errors   = 0
+
+
+async def _player(host, port, games, rounds, stats, started, seed, delay=0.0):
+    rng = random.Random(seed)
+    await asyncio.sleep(delay)
+    r, w = await asyncio.open_connection(host, port)
+
+    async def cmd(line: str) -> bytes:
+        t = time.perf_counter()
+        w.write(line.encode())
+        rep = await r.readline()
+        stats.lat.append(time.perf_counter() - t)
+        return rep
+
+    try:
+        for g in range(games):
+            pattern = [int((await cmd("N\n")).split()[1])]
+            if g == 0:
+                started()
+            while True:
+                if await r.readline() != b"P\n":        # wait out the SHOW
+                    stats.errors += 1; return
+                if len(pattern) > rounds:
+                    wrong = (pattern[0] + 1 + rng.randrange(5)) % 6
+                    if not (await cmd(f"P {wrong}\n")).startswith(b"O"):
+                        stats.errors += 1
+                    break
+                for i in pattern:
+                    rep = await cmd(f"P {i}\n")
+                if not rep.startswith(b"R"):
+                    stats.errors += 1; return
+                pattern.append(int((await r.readline()).split()[1]))
+            stats.sessions += 1
+        w.write(b"Q\n")
+    finally:
+        w.close()
+
+
+async def _control(host, port) -> tuple[int, int]:
+    r, w = await asyncio.open_connection(host, port)
+    w.write(b"M\n")
+    _, n, kb = (await r.readline()).split()
+    w.close()
+    return int(n), int(kb)
+
+
+async def run(host, port, clients, games, rounds, seed=0, ramp=1.0):
+    stats = Stats()
+    all_started = asyncio.Event()
+    count = [0]
+
+    def started():
+        count[0] += 1
+        if count[0] == clients:
+            all_started.set()
+
+    _, idle_kb = await _control(host, port)
+    t0 = time.perf_counter()
+    tasks = [asyncio.create_task(_player(host, port, games, rounds, stats, started, seed + i,
+                                         ramp * i / clients))
+             for i in range(clients)]
+    await asyncio.wait([asyncio.create_task(all_started.wait())] + tasks,
+                       return_when=asyncio.FIRST_COMPLETED)
+    open_n, peak_kb = await _control(host, port)
+    for res in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(res, Exception):
+            stats.errors += 1
+    wall = time.perf_counter() - t0
+
+    lat = np.array(stats.lat) * 1000
+    return {
+        "clients": clients, "sessions": stats.sessions, "errors": stats.errors,
+        "wall_s": round(wall, 2),
+        "sessions_per_s": round(stats.sessions / wall, 1),
+        "commands": len(lat),
+        "latency_ms": {p: round(float(np.percentile(lat, q)), 3) if len(lat) else None
+                       for p, q in (("p50", 50), ("p90", 90), ("p99", 99))},
+        "open_sessions": open_n - 1,        # minus the control connection
+        "kb_per_session": round((peak_kb - idle_kb) / max(1, open_n - 1), 2),
+    }
+
+
+async def _spawn():
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = await asyncio.create_subprocess_exec(sys.executable, os.path.join(here, "server.py"),
+                                                "--port", "0", stdout=asyncio.subprocess.PIPE)
+    line = (await proc.stdout.readline()).decode()
+    host, port = line.rsplit(" ", 1)[1].strip().rsplit(":", 1)
+    return proc, host, int(port)
+
+
+async def _main(a):
+    proc = None
+    if a.port is None:
+        proc, host, port = await _spawn()
+    else:
+        host, port = a.host, a.port
+    try:
+        res = await run(host, port, a.clients, a.games, a.rounds, a.seed, a.ramp)
+    finally:
+        if proc:
+            proc.terminate()
+            await proc.wait()
+    lat = res["latency_ms"]
+    print(f"{res['clients']} clients  {res['sessions']} sessions in {res['wall_s']} s  "
+          f"= {res['sessions_per_s']} sessions/s  ({res['errors']} errors)")
+    print(f"latency over {res['commands']} commands: p50 {lat['p50']} ms  "
+          f"p90 {lat['p90']} ms  p99 {lat['p99']} ms")
+    print(f"memory: {res['kb_per_session']} KiB per session ({res['open_sessions']} open)")
+    return res
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load generator for the Simon server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, help="connect to a running server instead of spawning one")
+    ap.add_argument("--clients", type=int, default=1000)
+    ap.add_argument("--games", type=int, default=1, help="games per client")
+    ap.add_argument("--rounds", type=int, default=2, help="rounds won before a deliberate miss")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--ramp", type=float, default=1.0, help="seconds over which clients connect")
+    a = ap.parse_args(argv)
+    raise_fd_limit()
+    res = asyncio.run(_main(a))
+    sys.exit(1 if res["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
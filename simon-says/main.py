@@ -3,4 +3,7 @@
 from game import SimonGame
 
 if __name__ == "__main__":
-    SimonGame().run()
\ No newline at end of file
+    import sys
+    # optional board size for the advanced tier, e.g. `python main.py 16x16`
+    board = tuple(map(int, sys.argv[1].split("x"))) if len(sys.argv) > 1 else None
+    SimonGame(board=board).run()
\ No newline at end of file
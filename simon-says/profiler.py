@@ -0,0 +1,350 @@
+"""Frame-phase profiler with a ring buffer, an on-screen overlay and export.
+
+``SIMON_PROFILE=1`` turns it on; ``SIMON_PROFILE=frames.csv`` (or ``.json``)
+also writes the ring buffer there on exit.  F3 toggles the overlay at any
+time.  When off, the game holds a :class:`NullProfiler` whose methods do
+nothing.
+
+:class:`InputLatency` does the same for input: ``SIMON_LATENCY=1`` (or a
+``.csv`` path) times every click from its arrival to the state change, the
+start of its tone and the first frame presented after it.
+
+:class:`AllocProfiler` adds allocations and garbage collections to the
+phase breakdown: ``SIMON_ALLOC=1`` (or a ``.csv`` / ``.json`` path) turns it
+on and prints a summary on exit.
+"""
+
+import gc, json, os, sys, time, tracemalloc
+import numpy as np
+import pygame
+from constants import WIDTH
+
+PHASES = ("events", "update", "fx", "draw", "present", "idle")
+PHASE_COLOURS = [(90,160,255), (255,200,60), (255,110,200), (90,230,120), (240,240,240), (90,90,90)]
+
+
+class NullProfiler:
+    enabled = visible = alloc = False
+    def begin(self): pass
+    def mark(self, phase): pass
+    def end(self): pass
+    def export(self): pass
+
+
+class FrameProfiler:
+    enabled = True
+    alloc   = False
+
+    def __init__(self, capacity: int = 600, phases=PHASES, export_path=None):
+        self.phases   = phases
+        self.capacity = capacity
+        self.times    = np.zeros((capacity, len(phases)), np.int64)   # ns per phase per frame
+        self.frames   = 0
+        self._row     = [0] * len(phases)
+        self._t       = 0
+        self.export_path = export_path
+        self.visible  = False
+        self.rect     = pygame.Rect(WIDTH - 270, 10, 260, 150)
+        self._font    = None
+        self._lines   = []
+        self._panel   = None
+
+    @classmethod
+    def from_env(cls, var="SIMON_PROFILE"):
+        v = os.environ.get(var, "")
+        if not v or v == "0":
+            return NullProfiler()
+        return cls(export_path=None if v == "1" else v)
+
+    # ---------------- Recording ----------------------------------
+    def begin(self):
+        self._row[:] = [0] * len(self.phases)
+        self._t = time.perf_counter_ns()
+
+    def mark(self, phase: int):
+        """Charge the time since the previous mark to ``phase`` (accumulates)."""
+        t = time.perf_counter_ns()
+        self._row[phase] += t - self._t
+        self._t = t
+
+    def end(self):
+        self.times[self.frames % self.capacity] = self._row
+        self.frames += 1
+
+    def durations_ms(self) -> np.ndarray:
+        """(frames, phases) phase durations, oldest first."""
+        if self.frames > self.capacity:
+            t = np.roll(self.times, -(self.frames % self.capacity), axis=0)
+        else:
+            t = self.times[:self.frames]
+        return t / 1e6
+
+    # ---------------- Export -------------------------------------
+    def export(self, path=None):
+        path = path or self.export_path
+        if not path:
+            return
+        d = self.durations_ms()
+        if str(path).endswith(".json"):
+            with open(path, "w") as fh:
+                json.dump({"phases": list(self.phases), "frames_ms": d.round(4).tolist()}, fh)
+        else:
+            np.savetxt(path, d, fmt="%.4f", delimiter=",", header=",".join(self.phases), comments="")
+
+    # ---------------- Overlay ------------------------------------
+    def draw(self, surf):
+        """Frame-time graph plus mean per-phase breakdown in ``self.rect``."""
+        surf.blit(self.render(), self.rect)
+        return self.rect
+
+    def render(self) -> pygame.Surface:
+        """The overlay panel, drawn in its own coordinates (reused between calls)."""
+        r = self.rect
+        if self._panel is None:
+            self._panel = pygame.Surface(r.size)
+        surf = self._panel
+        surf.fill((0, 0, 0))
+        pygame.draw.rect(surf, (80, 80, 80), surf.get_rect(), 1)
+        d = self.durations_ms()[-(r.w - 8):]
+        if not len(d):
+            return surf
+        gx, gy, gh = 4, 4, 60
+        pygame.draw.line(surf, (120, 40, 40), (gx, gy + gh//2), (r.w - 4, gy + gh//2))  # 1/60 s
+        busy = d[:, :-1].sum(1)             # excluding the idle wait
+        ys = gy + gh - np.minimum(busy * (60 / 2000), 1) * gh
+        if len(ys) > 1:
+            pygame.draw.lines(surf, (90, 230, 120), False, list(zip(range(gx, gx + len(ys)), ys.tolist())))
+
+        if self.frames % 30 == 0 or not self._lines:    # refresh the text twice a second
+            if self._font is None:
+                self._font = pygame.font.SysFont(None, 16)
+            mean = d.mean(0)
+            self._lines = [self._font.render(f"{name:<8} {mean[k]:6.2f} ms", True, PHASE_COLOURS[k])
+                           for k, name in enumerate(self.phases)]
+        y = gy + gh + 4
+        for line in self._lines:
+            surf.blit(line, (gx, y)); y += 13
+        return surf
+
+
+# ---------------- Allocations ------------------------------------
+class AllocProfiler(FrameProfiler):
+    """:class:`FrameProfiler` that also records bytes allocated and time spent
+    in garbage collection per frame and phase, and the growth in allocated
+    blocks from one frame's end to the next.
+
+    Bytes are the ``tracemalloc`` peak above the level the phase started at,
+    so short-lived objects count even when freed before the phase ends; the
+    profiler's own bookkeeping is measured at start-up and subtracted.  A
+    collection is charged to the phase it interrupted.  Tracing slows every
+    frame down, so the times are only comparable with each other.
+    """
+    alloc = True
+
+    def __init__(self, capacity: int = 600, phases=PHASES, export_path=None):
+        super().__init__(capacity, phases, export_path)
+        n = len(phases)
+        self.bytes    = np.zeros((capacity, n), np.int64)
+        self.blocks   = np.zeros(capacity, np.int64)             # net, per frame
+        self.gc_ns    = np.zeros((capacity, n), np.int64)
+        self.collections = [0, 0, 0]            # per generation, over the whole run
+        self.gc_max_ns   = 0
+        self._b, self._g = [0] * n, [0] * n
+        self._level   = self._nblocks = 0
+        self._gc_t0   = self._gc_open = 0       # GC time not charged to a phase yet
+        self._bias    = 0
+        self._own     = not tracemalloc.is_tracing()
+        if self._own:
+            tracemalloc.start()
+        gc.callbacks.append(self._on_gc)
+        self._calibrate()
+
+    @classmethod
+    def from_env(cls, var="SIMON_ALLOC"):
+        """An AllocProfiler if ``var`` is set, else ``FrameProfiler.from_env()``."""
+        v = os.environ.get(var, "")
+        if not v or v == "0":
+            return FrameProfiler.from_env()
+        return cls(export_path=None if v == "1" else v)
+
+    def _calibrate(self, n=32):
+        """Record ``n`` empty frames; what they show is the profiler's own cost."""
+        n = min(n, self.capacity)
+        for _ in range(n):
+            self.begin()
+            for phase in range(len(self.phases)):
+                self.mark(phase)
+            self.end()
+        self._bias = int(self.bytes[:n].min())
+        self.frames = 0
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._gc_t0 = time.perf_counter_ns()
+        else:
+            dt = time.perf_counter_ns() - self._gc_t0
+            self._gc_open += dt
+            self.collections[info["generation"]] += 1
+            self.gc_max_ns = max(self.gc_max_ns, dt)
+
+    # ---------------- Recording ----------------------------------
+    def begin(self):
+        n = len(self.phases)
+        self._b[:], self._g[:] = [0] * n, [0] * n
+        super().begin()
+        self._level = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def mark(self, phase: int):
+        cur, peak = tracemalloc.get_traced_memory()
+        super().mark(phase)
+        self._b[phase] += max(0, peak - self._level - self._bias)
+        self._g[phase] += self._gc_open
+        self._gc_open = 0
+        self._level = cur
+        tracemalloc.reset_peak()
+
+    def end(self):
+        row = self.frames % self.capacity
+        blocks = sys.getallocatedblocks()       # end to end, so our own objects cancel out
+        self.blocks[row], self._nblocks = blocks - self._nblocks, blocks
+        self.bytes[row], self.gc_ns[row] = self._b, self._g
+        super().end()
+
+    def stop(self):
+        """Detach from the garbage collector (and stop tracing, if we started it)."""
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if self._own and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _ordered(self, a) -> np.ndarray:
+        if self.frames > self.capacity:
+            return np.roll(a, -(self.frames % self.capacity), axis=0)
+        return a[:self.frames]
+
+    # ---------------- Results ------------------------------------
+    def summary(self) -> dict:
+        """Per-frame means per phase and in total, plus GC counts and pauses."""
+        b, k, g = self._ordered(self.bytes), self._ordered(self.blocks), self._ordered(self.gc_ns)
+        if not len(b):
+            return {}
+        bt = b.sum(1)
+        return {"frames": len(b), "bytes": round(float(bt.mean()), 1), "max_bytes": int(bt.max()),
+                "blocks": round(float(k.mean()), 3),
+                "phases": {name: {"bytes": round(float(b[:, i].mean()), 1),
+                                  "gc_ms": round(float(g[:, i].sum()) / 1e6, 3)}
+                           for i, name in enumerate(self.phases)},
+                "collections": list(self.collections), "gc_ms": round(float(g.sum()) / 1e6, 3),
+                "gc_max_ms": round(self.gc_max_ns / 1e6, 3)}
+
+    def report(self) -> str:
+        s = self.summary()
+        if not s:
+            return ""
+        lines = [f"  {s['frames']} frames: {s['bytes']:.0f} B/frame allocated (max {s['max_bytes']}), "
+                 f"{s['blocks']:+.3f} blocks/frame; {sum(s['collections'])} collections "
+                 f"{s['collections']}, {s['gc_ms']} ms, longest {s['gc_max_ms']} ms"]
+        lines += [f"    {name:<8} {p['bytes']:8.0f} B  gc {p['gc_ms']:7.3f} ms"
+                  for name, p in s["phases"].items()]
+        return "\n".join(lines)
+
+    def export(self, path=None):
+        path = path or self.export_path
+        if not path:
+            return
+        cols = {"ms": self.durations_ms(), "bytes": self._ordered(self.bytes),
+                "gc_ms": self._ordered(self.gc_ns) / 1e6}
+        blocks = self._ordered(self.blocks)
+        if str(path).endswith(".json"):
+            with open(path, "w") as fh:
+                json.dump({"phases": list(self.phases), "frames_blocks": blocks.tolist(),
+                           **{f"frames_{k}": np.round(v, 4).tolist() for k, v in cols.items()}}, fh)
+        else:
+            head = [f"{name}_{k}" for k in cols for name in self.phases] + ["blocks"]
+            np.savetxt(path, np.hstack([*cols.values(), blocks[:, None]]), fmt="%.4f", delimiter=",",
+                       header=",".join(head), comments="")
+
+
+# ---------------- Input latency ----------------------------------
+STATE, AUDIO, PRESENTED = range(3)
+LATENCY_STAGES = ("state", "audio", "present")
+
+
+class NullLatency:
+    enabled = False
+    def arrive(self, wall_ms): pass
+    def mark(self, stage): pass
+    def presented(self): pass
+    def summary(self): return {}
+    def export(self): pass
+
+
+class InputLatency:
+    """Milliseconds from each click's arrival to STATE, AUDIO and PRESENTED.
+
+    Stages that did not happen (a click on no pad plays no tone) stay NaN.
+    """
+    enabled = True
+
+    def __init__(self, capacity: int = 4096, export_path=None):
+        self.capacity = capacity
+        self.ms       = np.full((capacity, len(LATENCY_STAGES)), np.nan)
+        self.arrived  = np.zeros(capacity)          # wall ms of each click
+        self.count    = 0
+        self.export_path = export_path
+        self._open    : list[int] = []              # rows waiting for a present
+
+    @classmethod
+    def from_env(cls, var="SIMON_LATENCY"):
+        v = os.environ.get(var, "")
+        if not v or v == "0":
+            return NullLatency()
+        return cls(export_path=None if v == "1" else v)
+
+    def arrive(self, wall_ms: float):
+        """A click seen at ``wall_ms`` (``perf_counter`` ms) is being applied."""
+        row = self.count % self.capacity
+        self.ms[row] = np.nan
+        self.arrived[row] = wall_ms
+        self._open.append(row)
+        self.count += 1
+
+    def mark(self, stage: int):
+        """``stage`` reached for the click applied last."""
+        if self._open:
+            row = self._open[-1]
+            if np.isnan(self.ms[row, stage]):
+                self.ms[row, stage] = time.perf_counter() * 1000 - self.arrived[row]
+
+    def presented(self):
+        if self._open:
+            now = time.perf_counter() * 1000
+            for row in self._open:
+                self.ms[row, PRESENTED] = now - self.arrived[row]
+            self._open.clear()
+
+    def samples(self) -> np.ndarray:
+        return self.ms[:min(self.count, self.capacity)]
+
+    def summary(self) -> dict:
+        """p50/p90/p99/max ms per stage."""
+        d, out = self.samples(), {}
+        for k, name in enumerate(LATENCY_STAGES):
+            col = d[:, k][~np.isnan(d[:, k])]
+            if len(col):
+                p50, p90, p99 = np.percentile(col, [50, 90, 99])
+                out[name] = {"n": len(col), "p50_ms": round(p50, 3), "p90_ms": round(p90, 3),
+                             "p99_ms": round(p99, 3), "max_ms": round(col.max(), 3)}
+        return out
+
+    def report(self) -> str:
+        return "\n".join(f"  click -> {name:<8} p50 {st['p50_ms']:7.2f} ms  p90 {st['p90_ms']:7.2f}"
+                         f"  p99 {st['p99_ms']:7.2f}  max {st['max_ms']:7.2f}  (n={st['n']})"
+                         for name, st in self.summary().items())
+
+    def export(self, path=None):
+        path = path or self.export_path
+        if path:
+            np.savetxt(path, self.samples(), fmt="%.4f", delimiter=",",
+                       header=",".join(LATENCY_STAGES), comments="")
@@ -0,0 +1,226 @@
+"""Render backends: the software display Surface, or SDL textures.
+
+Both expose the slice of the ``Surface`` API the game draws with – ``blit``,
+``blits`` and ``rect`` – plus ``present``.  :class:`TextureBackend` uploads
+each source Surface once (small ones into shared atlas pages) and submits
+every frame as textured quads through ``pygame._sdl2``, which SDL batches.
+It prefers an accelerated renderer and falls back to SDL's software one.
+``SIMON_RENDER=texture`` selects it.
+"""
+
+import os, weakref
+from collections import OrderedDict
+import pygame
+from constants import RENDER_BACKEND
+
+try:
+    from pygame._sdl2.video import Window, Renderer, Texture
+except ImportError:                     # pygame built without _sdl2
+    Window = None
+
+WHITE_A   = (255, 255, 255, 255)
+PAGE      = 1024        # atlas page size
+ATLAS_MAX = 64          # surfaces up to this size (without per-pixel alpha) share pages
+MAX_PAGES = 4
+
+
+class SurfaceBackend:
+    name        = "surface"
+    partial     = True          # only the dirty rects are redrawn and presented
+    accelerated = False
+
+    def __init__(self, size, title=""):
+        self.screen = pygame.display.set_mode(size)
+        pygame.display.set_caption(title)
+
+    def convert(self, surf, alpha=False):
+        return surf.convert_alpha() if alpha else surf.convert()
+
+    def blit(self, src, dest, area=None, dynamic=False):
+        self.screen.blit(src, dest, area)
+
+    def blits(self, seq, doreturn=False):
+        self.screen.blits(seq, doreturn=False)
+
+    def rect(self, colour, rect, border_radius=0):
+        pygame.draw.rect(self.screen, colour, rect, border_radius=border_radius)
+
+    def present(self, rects):
+        pygame.display.update(rects)
+
+    def snapshot(self) -> pygame.Surface:
+        return self.screen.copy()
+
+
+class _Page:
+    """One atlas texture filled shelf by shelf; space is never reclaimed."""
+    def __init__(self, renderer):
+        self.surf = pygame.Surface((PAGE, PAGE), pygame.SRCALPHA, 32)
+        self.tex  = Texture(renderer, (PAGE, PAGE), streaming=True)
+        self.tex.blend_mode = 1                 # SDL_BLENDMODE_BLEND
+        self.x = self.y = self.shelf_h = 0
+
+    def add(self, src) -> pygame.Rect | None:
+        w, h = src.get_size()
+        if self.x + w > PAGE:
+            self.x, self.y, self.shelf_h = 0, self.y + self.shelf_h, 0
+        if self.y + h > PAGE:
+            return None
+        r = pygame.Rect(self.x, self.y, w, h)
+        self.surf.blit(src, r)
+        self.tex.update(self.surf.subsurface(r), r)
+        self.x += w
+        self.shelf_h = max(self.shelf_h, h)
+        return r
+
+
+class TextureBackend:
+    name    = "texture"
+    partial = False             # a renderer redraws the whole frame
+
+    def __init__(self, size, title=""):
+        self.window = Window(title, size)
+        try:
+            self.renderer, self.accelerated = Renderer(self.window, accelerated=1), True
+        except RuntimeError:                    # no GPU driver – SDL's software renderer
+            self.renderer, self.accelerated = Renderer(self.window, accelerated=0), False
+        self._tex    = weakref.WeakKeyDictionary()  # Surface -> (Texture, rect in it | None)
+        self._pages  : list[_Page] = []
+        self._shapes = OrderedDict()                # (w, h, radius) -> white rounded rect
+        self.uploads = 0
+
+    def convert(self, surf, alpha=False):
+        return surf                             # converted once, on upload
+
+    def _texture(self, src):
+        t = self._tex.get(src)
+        if t is None:
+            self.uploads += 1
+            w, h = src.get_size()
+            if w <= ATLAS_MAX and h <= ATLAS_MAX and not src.get_flags() & pygame.SRCALPHA:
+                for page in self._pages:
+                    r = page.add(src)
+                    if r:
+                        t = (page.tex, r); break
+                else:
+                    if len(self._pages) < MAX_PAGES:
+                        self._pages.append(_Page(self.renderer))
+                        t = (self._pages[-1].tex, self._pages[-1].add(src))
+            if t is None:
+                t = (Texture.from_surface(self.renderer, src), None)
+            self._tex[src] = t
+        return t
+
+    def blit(self, src, dest, area=None, dynamic=False):
+        """``dynamic`` surfaces change every frame and are re-uploaded each call."""
+        tex, off = (Texture.from_surface(self.renderer, src), None) if dynamic else self._texture(src)
+        if area is None:
+            area = off or src.get_rect()
+        else:
+            area = pygame.Rect(area)
+            if off:
+                area.move_ip(off.topleft)
+        x, y = dest[0], dest[1]
+        tex.draw(area, (x, y, area.w, area.h))
+
+    def blits(self, seq, doreturn=False):
+        texture = self._texture
+        for src, dest in seq:                   # dest: (x, y) or a Rect
+            tex, r = texture(src)
+            x, y = dest[0], dest[1]
+            if r is None:
+                tex.draw(None, (x, y, *src.get_size()))
+            else:
+                tex.draw(r, (x, y, r.w, r.h))
+
+    def rect(self, colour, rect, border_radius=0):
+        rect = pygame.Rect(rect)
+        if rect.w <= 0 or rect.h <= 0:
+            return
+        colour = tuple(int(c) for c in colour[:3])
+        if not border_radius:
+            self.renderer.draw_color = (*colour, 255)
+            self.renderer.fill_rect(rect)
+            return
+        key = (rect.w, rect.h, border_radius)
+        tex = self._shapes.get(key)
+        if tex is None:
+            s = pygame.Surface(rect.size, pygame.SRCALPHA)
+            pygame.draw.rect(s, WHITE_A, s.get_rect(), border_radius=border_radius)
+            tex = self._shapes[key] = Texture.from_surface(self.renderer, s)
+            if len(self._shapes) > 64:
+                self._shapes.popitem(last=False)
+        else:
+            self._shapes.move_to_end(key)
+        tex.color = colour
+        tex.draw(None, rect)
+
+    def present(self, rects):
+        self.renderer.present()
+
+    def snapshot(self) -> pygame.Surface:
+        """The frame drawn so far (before :meth:`present`)."""
+        return self.renderer.to_surface()
+
+
+def merge_rects(rects):
+    """Union overlapping rects so no pixel is composited twice."""
+    out = []
+    for r in rects:
+        r = r.copy()
+        i = r.collidelist(out)
+        while i != -1:
+            r.union_ip(out.pop(i))
+            i = r.collidelist(out)
+        out.append(r)
+    return out
+
+
+class DirtyRects:
+    """This frame's dirty rects merged with last frame's, without allocating.
+
+    :meth:`merge` does what ``merge_rects(dirty + prev)`` does, but the
+    result list and every Rect in it are reused from frame to frame.
+    """
+    def __init__(self):
+        self.prev    : list[pygame.Rect] = []   # rects added during the last frame
+        self._cur    : list[pygame.Rect] = []
+        self._pool   : list[pygame.Rect] = []   # grows to the busiest frame, never shrinks
+        self._out    : list[pygame.Rect] = []
+
+    def add(self, rect):
+        self._cur.append(rect)
+
+    def merge(self) -> list[pygame.Rect]:
+        """Regions to redraw (valid until the next call); starts the next frame."""
+        out, pool = self._out, self._pool
+        out.clear()
+        k = 0
+        for group in (self._cur, self.prev):
+            for r in group:
+                if k == len(pool):
+                    pool.append(pygame.Rect(r))
+                else:
+                    pool[k].update(r)
+                m = pool[k]; k += 1
+                i = m.collidelist(out)
+                while i != -1:
+                    m.union_ip(out.pop(i))
+                    i = m.collidelist(out)
+                out.append(m)
+        self.prev, self._cur = self._cur, self.prev
+        self._cur.clear()
+        return out
+
+
+def make_backend(kind=None, size=(800, 600), title=""):
+    """``kind`` is "surface" or "texture" (default: ``SIMON_RENDER`` or RENDER_BACKEND)."""
+    kind = kind or os.environ.get("SIMON_RENDER", RENDER_BACKEND)
+    if kind not in ("surface", "texture"):
+        raise ValueError(f"unknown render backend {kind!r}")
+    if kind == "texture" and Window is not None:
+        try:
+            return TextureBackend(size, title)
+        except RuntimeError:                    # no renderer at all – use the display surface
+            pass
+    return SurfaceBackend(size, title)
@@ -0,0 +1,77 @@
+"""Replay an input log through SimonGame.
+
+The log's seed rebuilds the same pattern and particles, and every input is
+applied on the logic step it was recorded on, so the run is reproduced
+exactly.  ``--speed 0`` (the default) runs as fast as the machine allows;
+``--speed 1`` plays back in real time.
+
+    python replay.py session.simlog [--speed 4] [--no-render] [--headless]
+"""
+
+import argparse, os, sys, time
+from constants import FPS, LOGIC_HZ
+from inputlog import read_log, IN_CLICK, IN_QUIT
+
+
+def replay(game, recs, speed: float = 0.0, render: bool = True):
+    """Drive ``game`` from ``recs``; returns the number of logic steps run."""
+    import pygame
+    step = game.step
+    step.acc = 0.0
+    frame_steps = max(1, round(1000 / FPS / step.step_ms))
+    wall0 = time.perf_counter()
+
+    def run_to(tick):
+        while step.steps < tick:
+            step.acc += step.step_ms
+            game._logic_step()
+            if step.steps % frame_steps == 0:
+                game.audio.pump()
+                if render:
+                    game._present()
+                    pygame.event.pump()
+                if speed:
+                    lag = step.sim_ms / speed / 1000 - (time.perf_counter() - wall0)
+                    if lag > 0:
+                        time.sleep(lag)
+
+    for tick, kind, x, y in recs.tolist():
+        run_to(tick)
+        if kind == IN_CLICK:
+            game._click((x, y), step.sim_ms)
+        elif kind == IN_QUIT:
+            break
+    return step.steps
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("log")
+    ap.add_argument("--speed", type=float, default=0.0, help="playback speed; 0 = as fast as possible")
+    ap.add_argument("--no-render", action="store_true", help="run the logic only")
+    ap.add_argument("--headless", action="store_true", help="use SDL's dummy video/audio drivers")
+    a = ap.parse_args(argv)
+
+    os.environ.pop("SIMON_RECORD", None)        # never overwrite the log being replayed
+    if a.headless:
+        os.environ["SDL_VIDEODRIVER"] = os.environ["SDL_AUDIODRIVER"] = "dummy"
+    head, recs = read_log(a.log)
+
+    from game import SimonGame
+    from scores import ScoreStore
+    game = SimonGame(board=head["board"], seed=head["seed"],
+                     scores=ScoreStore(":memory:", legacy_json=None))
+    game.ready.wait()
+    if round(1000 / game.step.step_ms) != head["hz"]:
+        sys.exit(f"log was recorded at {head['hz']} Hz logic, this build runs {LOGIC_HZ} Hz")
+    t0 = time.perf_counter()
+    steps = replay(game, recs, a.speed, not a.no_render)
+    wall = time.perf_counter() - t0
+    sim = steps * game.step.step_ms / 1000
+    print(f"{len(recs)} inputs, {sim:.1f} s of play in {wall:.2f} s ({sim / max(wall, 1e-9):.1f}x); "
+          f"score {game.score}, best {game.best}, pattern length {len(game.pattern)}")
+    game.close()
+
+
+if __name__ == "__main__":
+    main()
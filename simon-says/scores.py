@@ -0,0 +1,151 @@
+"""Score store – SQLite (WAL) written from a background thread.
+
+Every finished game is queued with :meth:`ScoreStore.record` and written by
+a single writer thread, so the render loop never touches the disk.  The
+best score is kept in memory; leaderboard queries use their own read
+connection.  A legacy ``simon_score.json`` is imported once, always under
+"classic" (the six-pad board it scored), whatever mode opens the store.
+
+Errors are printed to stderr and kept in :attr:`ScoreStore.errors`.  Once
+the writer has stopped – the database could not be opened, or the store
+was closed – :attr:`ScoreStore.dead` is set: the best score still updates
+in memory, but games are counted as dropped instead of being queued.
+"""
+
+import json, pathlib, queue, sqlite3, sys, threading, time
+from contextlib import closing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id        INTEGER PRIMARY KEY,
+    player    TEXT    NOT NULL DEFAULT '',
+    mode      TEXT    NOT NULL,
+    score     INTEGER NOT NULL,
+    ts        REAL    NOT NULL,
+    rounds_ms TEXT    NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS games_mode_score   ON games (mode, score DESC, ts);
+CREATE INDEX IF NOT EXISTS games_player_score ON games (player, mode, score DESC);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_STOP = object()
+LEGACY_MODE = "classic"             # the only board the JSON file ever scored
+
+
+class ScoreStore:
+    def __init__(self, path="simon_scores.db", legacy_json="simon_score.json", mode="classic"):
+        self.path   = str(path)
+        self.mode   = mode
+        self._best  : dict[str, int] = {}   # mode -> best score, kept in memory
+        self.errors: list[Exception] = []
+        self.dead   = False                 # the writer has stopped; record() drops games
+        self.dropped = 0
+        self._q     = queue.SimpleQueue()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._writer, args=(legacy_json,),
+                                        name="scorestore", daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # ---------------- Writer thread ----------------------------
+    def _writer(self, legacy_json):
+        try:
+            db = self._connect()
+            db.executescript(SCHEMA)
+            self._import_legacy(db, legacy_json)
+            for mode, best in db.execute("SELECT mode, MAX(score) FROM games GROUP BY mode"):
+                self._best[mode] = max(self._best.get(mode, 0), best)
+        except (sqlite3.Error, OSError) as e:
+            self._error(e)
+            self.dead = True
+            self._ready.set()
+            return
+        self._ready.set()
+
+        while True:
+            item = self._q.get()
+            batch = [item]
+            while not self._q.empty():          # coalesce bursts into one transaction
+                batch.append(self._q.get())
+            rows = [b for b in batch if b is not _STOP]
+            try:
+                with db:
+                    db.executemany("INSERT INTO games (player, mode, score, ts, rounds_ms) "
+                                   "VALUES (?, ?, ?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                self._error(e)
+            if len(rows) != len(batch):
+                self.dead = True
+                db.close()
+                return
+
+    def _error(self, e: Exception):
+        self.errors.append(e)
+        print(f"score store {self.path}: {e!r}", file=sys.stderr)
+
+    def _import_legacy(self, db, legacy_json):
+        if not legacy_json or db.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+            return
+        f = pathlib.Path(legacy_json)
+        try:
+            best = int(json.loads(f.read_text())["best"]) if f.exists() else 0
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            self._error(e)
+            best = 0
+        with db:
+            if best:
+                db.execute("INSERT INTO games (player, mode, score, ts) VALUES ('', ?, ?, ?)",
+                           (LEGACY_MODE, best, f.stat().st_mtime))
+            db.execute("INSERT INTO meta (key, value) VALUES ('legacy_imported', ?)", (str(time.time()),))
+
+    # ---------------- API (never blocks on disk) ---------------
+    @property
+    def best(self) -> int:
+        return self._best.get(self.mode, 0)
+
+    def best_for(self, mode: str) -> int:
+        """Best score of ``mode`` (each board size is its own mode)."""
+        return self._best.get(mode, 0)
+
+    def record(self, score: int, rounds_ms=(), player: str = "", mode: str | None = None):
+        """Queue a finished game; updates its mode's best score immediately."""
+        mode = mode or self.mode
+        self._best[mode] = max(self._best.get(mode, 0), score)
+        if self.dead:                       # nobody would drain the queue
+            self.dropped += 1
+            return
+        self._q.put((player, mode, int(score), time.time(), json.dumps([round(r) for r in rounds_ms])))
+
+    def close(self, timeout: float = 5.0):
+        """Flush pending writes and stop the writer thread."""
+        if not self.dead:
+            self._q.put(_STOP)
+        self._thread.join(timeout)
+        if self.dropped:
+            print(f"score store {self.path}: {self.dropped} games not saved", file=sys.stderr)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the database is open and the best scores are loaded."""
+        return self._ready.wait(timeout)
+
+    # ---------------- Queries (own connection) -----------------
+    def top(self, n: int = 10, mode: str | None = None):
+        """Best ``n`` games as (player, score, ts) – highest first."""
+        self._ready.wait()
+        with closing(sqlite3.connect(self.path, timeout=5)) as db:
+            return db.execute("SELECT player, score, ts FROM games WHERE mode = ? "
+                              "ORDER BY score DESC, ts LIMIT ?", (mode or self.mode, n)).fetchall()
+
+    def player_top(self, player: str, n: int = 10, mode: str | None = None):
+        """Best ``n`` games of one player as (score, ts, rounds_ms)."""
+        self._ready.wait()
+        with closing(sqlite3.connect(self.path, timeout=5)) as db:
+            rows = db.execute("SELECT score, ts, rounds_ms FROM games WHERE player = ? AND mode = ? "
+                              "ORDER BY score DESC LIMIT ?", (player, mode or self.mode, n)).fetchall()
+        return [(s, ts, json.loads(r)) for s, ts, r in rows]
@@ -0,0 +1,225 @@
+"""Asyncio Simon server – thousands of concurrent sessions over localhost TCP.
+
+Every connection is one player running the same :class:`core.SimonCore`
+rules as the desktop game.  SHOW phases and PLAY deadlines are driven by a
+single hashed timer wheel instead of a task or timer handle per session.
+
+Line protocol (ASCII).  Client → server::
+
+    N           start a new game
+    P <idx>     press button idx
+    M           server stats
+    Q           quit
+
+Server → client::
+
+    S <idx>     the pattern grew by idx and is being shown
+    P           the SHOW is over – your turn
+    K           correct press
+    R <score>   round complete (an ``S`` line follows)
+    O <score>   game over: wrong press or deadline missed
+    I           ignored (press outside PLAY)
+    M <sessions> <rss_kb>
+    E <message>
+
+    python server.py [--host 127.0.0.1] [--port 7777]
+"""
+
+import argparse, asyncio, random, time
+try:
+    import resource
+except ImportError:                     # Windows
+    resource = None
+from constants import SHOW_STEP_MS
+from core import SimonCore, SHOW, PLAY, EV_ROUND, EV_FAIL, EV_SEQUENCE
+
+
+def rss_kb() -> int:
+    """Resident set size (peak RSS where /proc is missing; 0 without ``resource``)."""
+    if resource is None:
+        return 0
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * resource.getpagesize() // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def raise_fd_limit():
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+# ---------------- Timer wheel ----------------------------------
+class TimerWheel:
+    """Hashed timing wheel: O(1) schedule; each tick scans one slot.
+
+    Entries further out than one revolution stay in their slot until due.
+    Cancellation is lazy – callers tag entries and ignore stale ones.
+    """
+    def __init__(self, tick_ms: int = 10, slots: int = 1024):
+        self.tick_ms = tick_ms
+        self.slots   = [[] for _ in range(slots)]
+        self.cur     = 0                    # tick index scanned up to
+
+    def schedule(self, when_ms, item):
+        t = max(int(when_ms // self.tick_ms), self.cur)
+        self.slots[t % len(self.slots)].append((when_ms, item))
+
+    def expire(self, now_ms) -> list:
+        """Remove and return every ``(when, item)`` due by ``now_ms``."""
+        due, end = [], int(now_ms // self.tick_ms)
+        while True:
+            slot = self.slots[self.cur % len(self.slots)]
+            if slot:
+                keep = [e for e in slot if e[0] > now_ms]
+                if len(keep) != len(slot):
+                    due += [e for e in slot if e[0] <= now_ms]
+                    slot[:] = keep
+            if self.cur >= end:
+                return due
+            self.cur += 1
+
+
+# ---------------- Sessions -------------------------------------
+class Session:
+    __slots__ = ("core", "writer", "gen")
+
+    def __init__(self, core, writer):
+        self.core, self.writer, self.gen = core, writer, 0
+
+
+class SimonServer:
+    def __init__(self, tick_ms: int = 10, seed=None):
+        self.wheel    = TimerWheel(tick_ms)
+        self.sessions : set[Session] = set()
+        self.rng      = random.Random(seed)
+        self._t0      = time.monotonic()
+
+    def now(self) -> int:
+        return int((time.monotonic() - self._t0) * 1000)
+
+    def _arm(self, s: Session):
+        """(Re)schedule the session's next wake-up: end of SHOW or the PLAY deadline."""
+        s.gen += 1
+        c = s.core
+        if c.state == SHOW:
+            self.wheel.schedule(c.show_next_ms + (len(c.pattern) - c.show_idx - 1) * SHOW_STEP_MS,
+                                (s, s.gen))
+        elif c.state == PLAY:
+            self.wheel.schedule(c.deadline_ms + 1, (s, s.gen))
+
+    def _wake(self, s: Session, now: int):
+        c = s.core
+        was = c.state
+        while c.state == SHOW and now >= c.show_next_ms:
+            c.update(now)
+        if c.state == PLAY and now > c.deadline_ms:
+            c.update(now)
+        out = "P\n" if was == SHOW and c.state == PLAY else ""
+        out += self._lines(c)
+        if out:
+            s.writer.write(out.encode())
+        self._arm(s)
+
+    @staticmethod
+    def _lines(c) -> str:
+        out = ""
+        for ev, idx in c.drain():
+            if ev == EV_ROUND:
+                out += f"R {c.score}\n"
+            elif ev == EV_SEQUENCE:
+                out += f"S {c.pattern[-1]}\n"
+            elif ev == EV_FAIL:
+                out += f"O {c.score}\n"
+        return out
+
+    async def _timers(self):
+        tick = self.wheel.tick_ms / 1000
+        while True:
+            await asyncio.sleep(tick)
+            now = self.now()
+            for _, (s, gen) in self.wheel.expire(now):
+                if gen == s.gen:
+                    self._wake(s, now)
+
+    # ---------------- Connections -------------------------------
+    async def handle(self, reader, writer):
+        s = Session(SimonCore(seed=self.rng.getrandbits(64), clock=self.now), writer)
+        self.sessions.add(s)
+        try:
+            async for line in reader:
+                out = self._command(s, line.split())
+                if out is None:
+                    break
+                writer.write(out.encode())
+                if writer.transport.get_write_buffer_size() > 1 << 16:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.discard(s)
+            s.gen += 1                      # orphan any pending timer
+            writer.close()
+
+    def _command(self, s: Session, cmd):
+        c, now = s.core, self.now()
+        if not cmd:
+            return "E empty\n"
+        op = cmd[0]
+        if op == b"P":
+            try:
+                idx = int(cmd[1])
+            except (IndexError, ValueError):
+                return "E bad press\n"
+            if not 0 <= idx < c.n_buttons:
+                return "E bad button\n"
+            if c.state == PLAY and now > c.deadline_ms:
+                c.update(now)               # deadline passed before the wheel fired
+            if c.state != PLAY:
+                return self._lines(c) or "I\n"
+            c.press(idx, now)
+            out = self._lines(c) or "K\n"
+        elif op == b"N":
+            c.start(now)
+            out = self._lines(c)
+        elif op == b"M":
+            return f"M {len(self.sessions)} {rss_kb()}\n"
+        elif op == b"Q":
+            return None
+        else:
+            return "E unknown command\n"
+        self._arm(s)
+        return out
+
+    async def serve(self, host="127.0.0.1", port=7777):
+        server = await asyncio.start_server(self.handle, host, port, backlog=4096)
+        timers = asyncio.create_task(self._timers())
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"listening on {host}:{port}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            timers.cancel()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Multi-session Simon server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=7777, help="0 picks a free port")
+    ap.add_argument("--tick-ms", type=int, default=10, help="timer wheel resolution")
+    ap.add_argument("--seed", type=int)
+    a = ap.parse_args(argv)
+    raise_fd_limit()
+    try:
+        asyncio.run(SimonServer(a.tick_ms, a.seed).serve(a.host, a.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
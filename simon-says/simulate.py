@@ -0,0 +1,195 @@
+"""Batch simulation – many independent seeded Simon games in lockstep.
+
+:class:`BatchCore` mirrors the rules in :mod:`core` with per-instance state
+held in NumPy arrays; :func:`simulate` drives it with a simple model player
+for difficulty tuning.  Run ``python simulate.py --games 1000000``.
+
+Every instance draws its pattern from its own key with the counter-based
+generator of :class:`core.Pattern`, vectorised, so instance ``i`` plays
+exactly the game of a ``SimonCore`` whose pattern has key ``keys[i]`` –
+whatever the batch size and whatever the other instances do.
+"""
+
+import argparse, os, time
+import numpy as np
+from constants import (PLAYER_TIME_MS, SHOW_START_MS, SHOW_STEP_MS, SHOW_ROUND_MS)
+from core import START, SHOW, PLAY, GAMEOVER, Pattern
+
+NO_PRESS = -1
+GOLDEN   = np.uint64(Pattern.GOLDEN)
+
+
+def mix64(x: np.ndarray) -> np.ndarray:
+    """:func:`core._mix64` on a uint64 array (products wrap mod 2**64)."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class BatchCore:
+    """``n`` games under the rules of :class:`core.SimonCore`, one array slot each.
+
+    Instance ``i`` plays its first game on pattern key ``keys[i]`` – by
+    default ``(seed << 32) + i`` – and each later game on ``mix64`` of the
+    previous key.
+    """
+    def __init__(self, n: int, n_buttons: int = 6, seed=None,
+                 player_time_ms: int = PLAYER_TIME_MS, keys=None):
+        self.n, self.n_buttons = n, n_buttons
+        self.player_time_ms    = player_time_ms
+        if keys is None:
+            base = int.from_bytes(os.urandom(8), "little") if seed is None else seed << 32
+            keys = np.arange(n, dtype=np.uint64) + np.uint64(base & (2**64 - 1))
+        self.key          = np.array(keys, np.uint64)
+        self.played       = np.zeros(n, bool)          # has started a game (and used its key)
+        self.length       = np.zeros(n, np.int32)
+        self.state        = np.full(n, START, np.int8)
+        self.show_idx     = np.full(n, -1, np.int32)
+        self.player_idx   = np.zeros(n, np.int32)
+        self.score        = np.zeros(n, np.int32)
+        self.show_next_ms = np.zeros(n, np.int64)
+        self.deadline_ms  = np.zeros(n, np.int64)
+
+    def step(self, rows, k) -> np.ndarray:
+        """Pattern step ``k[j]`` of instance ``rows[j]``, as :meth:`core.Pattern.step`."""
+        x = mix64(self.key[rows] + np.asarray(k).astype(np.uint64) * GOLDEN)
+        return (x % np.uint64(self.n_buttons)).astype(np.int64)
+
+    # ---------------- Game flow ------------------------------
+    def start(self, mask, now):
+        now = np.broadcast_to(now, (self.n,))
+        again = mask & self.played
+        self.key[again] = mix64(self.key[again])
+        self.played |= mask
+        self.length[mask] = 1; self.score[mask] = 0
+        self.state[mask] = SHOW; self.show_idx[mask] = -1
+        self.show_next_ms[mask] = now[mask] + SHOW_START_MS
+
+    def tap(self, mask, now):
+        self.start(mask & (self.state == START), now)
+        self.state[mask & (self.state == GAMEOVER)] = START
+
+    def update(self, now):
+        """Advance SHOW sequences and enforce PLAY deadlines for every instance."""
+        now = np.broadcast_to(now, (self.n,))
+        due = (self.state == SHOW) & (now >= self.show_next_ms)
+        self.show_idx[due] += 1
+        done = due & (self.show_idx == self.length)
+        self.state[done] = PLAY; self.player_idx[done] = 0
+        self.deadline_ms[done] = now[done] + self.player_time_ms
+        step = due & ~done
+        self.show_next_ms[step] += SHOW_STEP_MS
+
+        late = (self.state == PLAY) & (now > self.deadline_ms) & ~done
+        self.state[late] = GAMEOVER
+
+    def press(self, idx, now):
+        """``idx[i]`` is the button instance ``i`` pressed, or ``NO_PRESS``."""
+        now = np.broadcast_to(now, (self.n,))
+        act = (self.state == PLAY) & (idx != NO_PRESS)
+        rows = np.flatnonzero(act)
+        want = self.step(rows, self.player_idx[rows])
+        ok = idx[rows] == want
+        self.state[rows[~ok]] = GAMEOVER
+
+        good = rows[ok]
+        self.player_idx[good] += 1
+        self.deadline_ms[good] = now[good] + self.player_time_ms
+        won = good[self.player_idx[good] == self.length[good]]
+        self.score[won] += 1
+        self.length[won] += 1
+        self.state[won] = SHOW; self.show_idx[won] = -1
+        self.show_next_ms[won] = now[won] + SHOW_ROUND_MS
+
+    def finish_show(self):
+        """Skip to the last SHOW flash as if every earlier one fired exactly on time."""
+        m = (self.state == SHOW) & (self.show_idx < self.length - 1)
+        self.show_next_ms[m] += (self.length[m] - 1 - self.show_idx[m]) * SHOW_STEP_MS
+        self.show_idx[m] = self.length[m] - 1
+
+    def compact(self, keep):
+        """Drop every instance not selected by ``keep`` (bool mask or indices)."""
+        for name in ("key", "played", "length", "state", "show_idx", "player_idx",
+                     "score", "show_next_ms", "deadline_ms"):
+            setattr(self, name, getattr(self, name)[keep])
+        self.n = len(self.state)
+
+    def expected(self):
+        """Button each instance must press next (meaningful in PLAY only)."""
+        return self.step(np.arange(self.n), self.player_idx)
+
+
+# ---------------- Model player -------------------------------
+def simulate(games: int, seed=0, error_rate: float = .02, reaction_ms=(600, 250),
+             player_time_ms: int = PLAYER_TIME_MS, max_rounds: int = 1000, n_buttons: int = 6):
+    """Play ``games`` games to completion; returns final scores.
+
+    Each press takes ``normal(*reaction_ms)`` ms (timeouts happen naturally)
+    and is wrong with probability ``error_rate``.  Games reaching
+    ``max_rounds`` are stopped there.
+    """
+    b = BatchCore(games, n_buttons, seed, player_time_ms)
+    rng = np.random.default_rng(None if seed is None else seed + 1)
+    now = np.zeros(games, np.int64)
+    press_at = np.zeros(games, np.int64)
+    b.start(np.ones(games, bool), now)
+    live = np.ones(games, bool)
+    ids = np.arange(games)
+    scores = np.zeros(games, np.int32)
+
+    def schedule(mask):
+        react = np.maximum(rng.normal(*reaction_ms, int(mask.sum())), 50).astype(np.int64)
+        press_at[mask] = now[mask] + react
+
+    while live.any():
+        if live.sum() * 2 < b.n:   # keep the arrays proportional to live games
+            scores[ids[~live]] = b.score[~live]
+            ids, now, press_at = ids[live], now[live], press_at[live]
+            b.compact(live)
+            live = np.ones(b.n, bool)
+        n = b.n
+
+        # jump every instance straight to its next event
+        b.finish_show()
+        nxt = np.where(b.state == SHOW, b.show_next_ms,
+                       np.minimum(press_at, b.deadline_ms + 1))
+        np.copyto(now, nxt, where=live)
+
+        was_show = b.state == SHOW
+        b.update(now)
+        schedule(was_show & (b.state == PLAY))
+
+        due = live & (b.state == PLAY) & (now >= press_at)
+        want = b.expected().astype(np.int64)
+        wrong = rng.random(n) < error_rate
+        idx = np.where(wrong, (want + rng.integers(1, n_buttons, n)) % n_buttons, want)
+        b.press(np.where(due, idx, NO_PRESS), now)
+        schedule(due & (b.state == PLAY))
+
+        b.state[b.score >= max_rounds] = GAMEOVER
+        live &= b.state != GAMEOVER
+    scores[ids] = b.score
+    return scores
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--games", type=int, default=100_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--error-rate", type=float, default=.02)
+    ap.add_argument("--reaction-ms", type=float, nargs=2, default=(600, 250), metavar=("MEAN", "SD"))
+    ap.add_argument("--player-time-ms", type=int, default=PLAYER_TIME_MS)
+    ap.add_argument("--max-rounds", type=int, default=1000)
+    a = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    scores = simulate(a.games, a.seed, a.error_rate, tuple(a.reaction_ms),
+                      a.player_time_ms, a.max_rounds)
+    dt = time.perf_counter() - t0
+    pct = np.percentile(scores, [10, 50, 90, 99])
+    print(f"{a.games} games in {dt:.2f}s ({a.games/dt:,.0f} games/s)")
+    print(f"score mean {scores.mean():.2f}  p10/p50/p90/p99 {pct.tolist()}  max {scores.max()}")
+
+
+if __name__ == "__main__":
+    main()
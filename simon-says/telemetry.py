@@ -0,0 +1,239 @@
+"""Gameplay telemetry: a non-blocking record stream and its offline analysis.
+
+The game appends plain tuples to a ``collections.deque`` – an atomic,
+lock-free append under the GIL – and never waits on I/O.  A background
+thread drains the deque every ``flush_s`` seconds, turns each batch into
+NumPy structured arrays and writes a rotating series of ``.npz`` chunk
+files (one array per record kind, plus the session's settings), a new
+chunk every ``chunk_rows`` rows or ``chunk_s`` seconds.
+
+``SIMON_TELEMETRY=dir`` turns it on.  Analyse a directory of chunks with::
+
+    python telemetry.py dir [--json out.json]
+"""
+
+import argparse, glob, json, os, sys, threading, time
+from collections import deque
+import numpy as np
+from constants import PLAYER_TIME_MS, SHOW_START_MS, SHOW_STEP_MS, SHOW_ROUND_MS
+from core import FAIL_WRONG, FAIL_TIMEOUT
+
+# round = pattern length being played; step = position in it
+CLICK = np.dtype([("t_ms", "<f8"), ("round", "<u4"), ("step", "<u4"), ("button", "<u2"),
+                  ("rt_ms", "<f4"), ("ok", "u1")])
+ROUND = np.dtype([("t_ms", "<f8"), ("round", "<u4"), ("ms", "<f4")])
+FAIL  = np.dtype([("t_ms", "<f8"), ("round", "<u4"), ("step", "<u4"), ("cause", "u1")])
+# frame summaries are stamped in wall ms since the session began, the rest in logic ms
+FRAME = np.dtype([("t_ms", "<f8"), ("frames", "<u4"), ("mean_ms", "<f4"), ("p99_ms", "<f4"),
+                  ("max_ms", "<f4"), ("dropped", "<u4")])
+KINDS = {"click": CLICK, "round": ROUND, "fail": FAIL, "frame": FRAME}
+
+
+class NullTelemetry:
+    enabled = False
+    def click(self, t_ms, rnd, step, button, rt_ms, ok): pass
+    def round(self, t_ms, rnd, ms): pass
+    def fail(self, t_ms, rnd, step, cause): pass
+    def frame(self, ms, dropped=0): pass
+    def close(self): pass
+
+
+class Telemetry:
+    enabled = True
+
+    def __init__(self, directory, seed: int = 0, n_buttons: int = 6, flush_s: float = 1.0,
+                 chunk_rows: int = 8192, chunk_s: float = 60.0, frame_window: int = 256):
+        os.makedirs(directory, exist_ok=True)
+        self.dir        = directory
+        self.session    = f"{int(time.time())}-{seed & 0xFFFFFFFF:08x}"
+        self.meta       = {"session": self.session, "seed": seed, "n_buttons": n_buttons,
+                           "player_time_ms": PLAYER_TIME_MS, "show_start_ms": SHOW_START_MS,
+                           "show_step_ms": SHOW_STEP_MS, "show_round_ms": SHOW_ROUND_MS}
+        self.flush_s    = flush_s
+        self.chunk_rows = chunk_rows
+        self.chunk_s    = chunk_s
+        self.files      : list[str] = []
+        self.errors     : list[Exception] = []
+        self._q         = deque()
+        self._frames    = np.zeros(frame_window, np.float32)   # frame times since the last summary
+        self._nf        = 0
+        self._tf        = 0.0                # ms of the last frame summary
+        self._t0        = time.perf_counter()
+        self._stop      = threading.Event()
+        self._thread    = threading.Thread(target=self._writer, name="telemetry", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls, seed=0, n_buttons=6, var="SIMON_TELEMETRY"):
+        d = os.environ.get(var, "")
+        return cls(d, seed, n_buttons) if d else NullTelemetry()
+
+    # ---------------- Producer side (game thread) ----------------
+    def click(self, t_ms, rnd, step, button, rt_ms, ok):
+        self._q.append(("click", (t_ms, rnd, step, button, rt_ms, ok)))
+
+    def round(self, t_ms, rnd, ms):
+        self._q.append(("round", (t_ms, rnd, ms)))
+
+    def fail(self, t_ms, rnd, step, cause):
+        self._q.append(("fail", (t_ms, rnd, step, cause)))
+
+    def frame(self, ms: float, dropped: int = 0):
+        """One frame's duration; summarised once a second (or per window)."""
+        self._frames[self._nf] = ms
+        self._nf += 1
+        t = (time.perf_counter() - self._t0) * 1000
+        if self._nf == len(self._frames) or t - self._tf >= 1000:
+            f = self._frames[:self._nf]
+            self._q.append(("frame", (t, self._nf, f.mean(), np.percentile(f, 99), f.max(), dropped)))
+            self._nf, self._tf = 0, t
+
+    # ---------------- Writer thread ------------------------------
+    def _writer(self):
+        chunk, rows, opened = {k: [] for k in KINDS}, 0, time.monotonic()
+        while True:
+            stopping = self._stop.wait(self.flush_s)
+            q = self._q
+            batch = {k: [] for k in KINDS}
+            for _ in range(len(q)):             # only what is there now; popleft is atomic
+                kind, rec = q.popleft()
+                batch[kind].append(rec)
+            for kind, recs in batch.items():
+                if recs:
+                    chunk[kind].append(np.array(recs, KINDS[kind]))
+                    rows += len(recs)
+            if rows and (stopping or rows >= self.chunk_rows
+                         or time.monotonic() - opened >= self.chunk_s):
+                self._write(chunk)
+                chunk, rows, opened = {k: [] for k in KINDS}, 0, time.monotonic()
+            if stopping:
+                return
+
+    def _write(self, chunk):
+        path = os.path.join(self.dir, f"{self.session}.{len(self.files):04d}.npz")
+        arrays = {k: np.concatenate(v) if v else np.zeros(0, KINDS[k]) for k, v in chunk.items()}
+        try:
+            with open(path + ".tmp", "wb") as fh:
+                np.savez(fh, meta=np.array(json.dumps(self.meta)), **arrays)
+            os.replace(path + ".tmp", path)     # readers never see a half-written chunk
+            self.files.append(path)
+        except OSError as e:
+            self.errors.append(e)
+
+    def close(self, timeout=5.0):
+        """Flush what is queued and stop the writer."""
+        self._stop.set()
+        self._thread.join(timeout)
+
+
+# ---------------- Analysis ---------------------------------------
+def load(directory) -> tuple[dict[str, np.ndarray], list[dict]]:
+    """Concatenate every chunk in ``directory``; each array gets a ``session`` index column."""
+    parts, metas, ids = {k: [] for k in KINDS}, [], {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.npz"))):
+        with np.load(path) as z:
+            meta = json.loads(str(z["meta"]))
+            sid = ids.setdefault(meta["session"], len(ids))
+            if sid == len(metas):
+                metas.append(meta)
+            for k in KINDS:
+                a = z[k]
+                if len(a):
+                    parts[k].append((a, sid))
+    out = {}
+    for k, dt in KINDS.items():
+        recs = np.concatenate([a for a, _ in parts[k]]) if parts[k] else np.zeros(0, dt)
+        arr = np.empty(len(recs), dt.descr + [("session", "<u4")])
+        for name in dt.names:
+            arr[name] = recs[name]
+        arr["session"] = np.repeat([sid for _, sid in parts[k]], [len(a) for a, _ in parts[k]])
+        out[k] = arr
+    return out, metas
+
+
+def _per_session_max(session, values):
+    out = np.zeros(int(session.max(initial=0)) + 1, np.int64)
+    np.maximum.at(out, session, values)
+    return out
+
+
+def analyse(data) -> dict:
+    """Reaction-time distribution, per-round difficulty and frame-time summary."""
+    clicks, fails, rounds, frames = data["click"], data["fail"], data["round"], data["frame"]
+    res = {"clicks": len(clicks), "rounds_won": len(rounds), "games_lost": len(fails)}
+    ok = clicks["ok"] == 1
+    rt = clicks["rt_ms"][ok].astype(np.float64)
+    if len(rt):
+        q = np.percentile(rt, [10, 25, 50, 75, 90, 99])
+        edges = np.arange(0, PLAYER_TIME_MS + 250, 250)
+        hist, _ = np.histogram(np.minimum(rt, edges[-1] - 1), edges)
+        res["reaction_ms"] = {"mean": round(rt.mean(), 1),
+                              **{f"p{p}": round(v, 1) for p, v in zip((10, 25, 50, 75, 90, 99), q)},
+                              "histogram": {f"{lo}-{lo + 250}": int(n) for lo, n in zip(edges[:-1], hist)}}
+
+    # difficulty: of the games that reached round r, how many were lost there and how
+    top = int(max(clicks["round"].max(initial=0), fails["round"].max(initial=0)))
+    won  = np.bincount(rounds["round"], minlength=top + 1)[:top + 1]
+    lost = np.bincount(fails["round"], minlength=top + 1)[:top + 1]
+    lost_timeout = np.bincount(fails["round"][fails["cause"] == FAIL_TIMEOUT], minlength=top + 1)[:top + 1]
+    played = won + lost
+    n = np.bincount(clicks["round"][ok], minlength=top + 1)[:top + 1]
+    rt_sum = np.bincount(clicks["round"][ok], clicks["rt_ms"][ok], minlength=top + 1)[:top + 1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        curve = np.stack([np.arange(top + 1), played, lost / played, lost_timeout / np.maximum(lost, 1),
+                          rt_sum / n], 1)[1:]
+    res["rounds"] = [{"round": int(r), "played": int(p), "fail_rate": round(float(f), 4),
+                      "timeout_share": round(float(t), 4),
+                      "mean_rt_ms": None if np.isnan(m) else round(float(m), 1)}
+                     for r, p, f, t, m in curve.tolist() if p]
+    res["fail_causes"] = {"wrong": int((fails["cause"] == FAIL_WRONG).sum()),
+                          "timeout": int((fails["cause"] == FAIL_TIMEOUT).sum())}
+    if len(frames):
+        w = frames["frames"].astype(np.float64)
+        res["frames"] = {"frames": int(w.sum()),
+                         "mean_ms": round(float((frames["mean_ms"] * w).sum() / w.sum()), 3),
+                         "p99_ms_median": round(float(np.median(frames["p99_ms"])), 3),
+                         "max_ms": round(float(frames["max_ms"].max()), 3),
+                         "dropped": int(_per_session_max(frames["session"], frames["dropped"]).sum())}
+    return res
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Analyse telemetry chunks written with SIMON_TELEMETRY")
+    ap.add_argument("dir")
+    ap.add_argument("--json", help="write the full analysis here")
+    a = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    data, metas = load(a.dir)
+    t1 = time.perf_counter()
+    res = analyse(data)
+    res["sessions"] = len(metas)
+    print(f"{len(metas)} sessions, {res['clicks']} clicks: loaded in {t1 - t0:.2f} s, "
+          f"analysed in {time.perf_counter() - t1:.2f} s")
+    if "reaction_ms" in res:
+        r = res["reaction_ms"]
+        print(f"reaction ms: mean {r['mean']}  p10 {r['p10']}  p50 {r['p50']}  p90 {r['p90']}  p99 {r['p99']}")
+        hist = list(r["histogram"].items())
+        while len(hist) > 1 and not hist[-1][1]:   # trim the empty tail
+            hist.pop()
+        peak = max(n for _, n in hist)
+        for label, n in hist:
+            print(f"  {label:>11} {'#' * round(40 * n / max(peak, 1)):<40} {n}")
+    print(f"games lost: {res['fail_causes']['wrong']} wrong button, {res['fail_causes']['timeout']} timeout")
+    print(" round  played  fail%  timeout%  mean rt")
+    for row in res["rounds"]:
+        rt = "" if row["mean_rt_ms"] is None else f"{row['mean_rt_ms']:7.1f}"
+        print(f"{row['round']:6} {row['played']:7} {row['fail_rate']*100:6.1f} "
+              f"{row['timeout_share']*100:8.1f}  {rt}")
+    if "frames" in res:
+        f = res["frames"]
+        print(f"frames: {f['frames']}  mean {f['mean_ms']} ms  median p99 {f['p99_ms_median']} ms  "
+              f"max {f['max_ms']} ms  dropped {f['dropped']}")
+    if a.json:
+        with open(a.json, "w") as fh:
+            json.dump(res, fh, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
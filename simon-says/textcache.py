@@ -0,0 +1,67 @@
+"""Bounded LRU cache for rendered text plus a digit atlas for numeric counters."""
+
+import pygame
+from collections import OrderedDict
+
+DIGITS = "0123456789-"
+
+class TextCache:
+    def __init__(self, maxsize: int = 128):
+        self.maxsize   = maxsize
+        self._surfs    = OrderedDict()   # (font, text, colour, aa) -> Surface
+        self._glyphs   = {}              # (font, colour, aa) -> {char: Surface}
+        self.hits = self.misses = self.evictions = 0
+
+    # ---------------- Whole strings ----------------------------
+    def render(self, font: pygame.font.Font, text: str, colour, antialias: bool = True) -> pygame.Surface:
+        key = (font, text, tuple(colour), antialias)
+        surf = self._surfs.get(key)
+        if surf is not None:
+            self.hits += 1
+            self._surfs.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = self._surfs[key] = font.render(text, antialias, colour)
+        if len(self._surfs) > self.maxsize:
+            self._surfs.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    # ---------------- Numeric counters -------------------------
+    def _atlas(self, font, colour, antialias):
+        key = (font, tuple(colour), antialias)
+        atlas = self._glyphs.get(key)
+        if atlas is None:
+            self.misses += 1
+            atlas = self._glyphs[key] = {c: font.render(c, antialias, colour) for c in DIGITS}
+        else:
+            self.hits += 1
+        return atlas
+
+    def number_size(self, font, prefix: str, value: int, colour, antialias: bool = True):
+        atlas = self._atlas(font, colour, antialias)
+        w, h = self.render(font, prefix, colour, antialias).get_size() if prefix else (0, 0)
+        for c in str(value):
+            g = atlas[c]
+            w += g.get_width(); h = max(h, g.get_height())
+        return w, h
+
+    def blit_number(self, surf, font, prefix: str, value: int, colour, pos, antialias: bool = True) -> pygame.Rect:
+        """Blit ``prefix`` (cached) followed by ``value`` assembled from digit glyphs."""
+        x, y = pos
+        if prefix:
+            p = self.render(font, prefix, colour, antialias)
+            surf.blit(p, (x, y)); x += p.get_width()
+        atlas = self._atlas(font, colour, antialias)
+        for c in str(value):
+            g = atlas[c]
+            surf.blit(g, (x, y)); x += g.get_width()
+        return pygame.Rect(pos[0], y, x - pos[0], font.get_height())
+
+    # ---------------- Diagnostics ------------------------------
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self._surfs), "atlases": len(self._glyphs)}
+
+    def clear(self):
+        self._surfs.clear(); self._glyphs.clear()
@@ -0,0 +1,161 @@
+"""Fixed-timestep scheduling and frame pacing.
+
+Game logic and particle physics advance in fixed steps of ``1/LOGIC_HZ``
+driven by an accumulator; rendering happens once per loop iteration at
+whatever rate the machine sustains and interpolates between the last two
+logic states.  When the loop falls behind, renders are skipped – logic
+steps never are.  :class:`StageTimer` times the staged startup.
+"""
+
+import threading, time
+from contextlib import contextmanager
+from constants import FPS, LOGIC_HZ, MAX_STEPS, PACING, STARTUP_BUDGET_MS
+
+
+class FixedStep:
+    def __init__(self, hz: float = LOGIC_HZ, max_steps: int = MAX_STEPS):
+        self.step_ms   = 1000 / hz
+        self.max_steps = max_steps
+        self.acc       = 0.0
+        self.steps     = 0          # logic steps taken so far
+        self.dropped   = 0          # renders skipped to catch up
+        self.t0        = None       # wall time of the first advance
+        self._last     = None
+
+    @property
+    def sim_ms(self) -> float:
+        """Logic time of the newest state, from 0 (no drift: derived from the step count)."""
+        return self.steps * self.step_ms
+
+    def advance(self, now_ms: float) -> int:
+        """Feed wall time in; returns how many logic steps to run now."""
+        if self._last is None:
+            self.t0 = self._last = now_ms
+        self.acc += now_ms - self._last
+        self._last = now_ms
+        return min(int(self.acc // self.step_ms), self.max_steps)
+
+    def skip(self, now_ms: float):
+        """Drop wall time that passed while idle – logic time does not advance."""
+        if self._last is not None:
+            self._last = now_ms
+
+    def sim_at(self, wall_ms: float) -> float:
+        """Logic time matching wall time ``wall_ms`` (e.g. an input's arrival)."""
+        if self._last is None:
+            return self.sim_ms
+        return self.sim_ms + self.acc + (wall_ms - self._last)
+
+    def tick(self) -> float:
+        """Consume one step from the accumulator; returns its logic time."""
+        self.acc -= self.step_ms
+        self.steps += 1
+        return self.sim_ms
+
+    @property
+    def behind(self) -> bool:
+        """True when whole steps are still owed – skip this render and catch up."""
+        return self.acc >= self.step_ms
+
+    @property
+    def alpha(self) -> float:
+        return self.acc / self.step_ms
+
+    def render_ms(self) -> float:
+        """Time matching the interpolated state (one step behind the newest)."""
+        return self.sim_ms - self.step_ms * (1 - self.alpha)
+
+
+class Pacer:
+    """Caps the render rate at ``fps``.
+
+    ``sleep`` relies on the OS timer alone, ``busy`` spins, ``hybrid``
+    sleeps until ``spin_ms`` before the deadline and spins the rest, and
+    ``off`` renders as fast as possible.
+    """
+    MODES = ("sleep", "hybrid", "busy", "off")
+
+    def __init__(self, fps: float = FPS, mode: str = PACING, spin_ms: float = 2.0):
+        if mode not in self.MODES:
+            raise ValueError(f"unknown pacing mode {mode!r}; expected one of {self.MODES}")
+        self.period = 1 / fps
+        self.mode   = mode
+        self.spin   = spin_ms / 1000
+        self._next  = time.perf_counter() + self.period
+
+    def wait(self, poll=None, poll_ms: float = 1.0) -> bool:
+        """Wait for the next frame slot.
+
+        ``poll`` is called about every ``poll_ms`` while waiting; if it
+        returns True the wait ends at once, the frame schedule restarts from
+        now and ``wait`` returns True.
+        """
+        now = time.perf_counter()
+        target = self._next
+        if poll is not None and self.mode != "off":
+            step = poll_ms / 1000
+            while now < target:
+                if poll():
+                    self._next = time.perf_counter() + self.period
+                    return True
+                left = target - time.perf_counter()
+                if self.mode == "busy" or (self.mode == "hybrid" and left <= self.spin):
+                    end = time.perf_counter() + min(step, left)
+                    while time.perf_counter() < end:
+                        pass
+                elif left > 0:
+                    time.sleep(min(step, left - (self.spin if self.mode == "hybrid" else 0)))
+                now = time.perf_counter()
+        elif self.mode != "off" and now < target:
+            if self.mode == "sleep":
+                time.sleep(target - now)
+            else:
+                if self.mode == "hybrid" and target - now > self.spin:
+                    time.sleep(target - now - self.spin)
+                while time.perf_counter() < target:
+                    pass
+            now = time.perf_counter()
+        # schedule from the ideal deadline, but never bank more than one late frame
+        self._next = max(target + self.period, now)
+        return False
+
+    def reset(self):
+        """Start a fresh frame schedule, e.g. after blocking while idle."""
+        self._next = time.perf_counter() + self.period
+
+
+class StageTimer:
+    """Start offset and duration of each named startup stage, per thread."""
+    def __init__(self, budget_ms: float = STARTUP_BUDGET_MS):
+        self.budget_ms = budget_ms
+        self.t0        = time.perf_counter()
+        self.stages    : list[tuple[str, float, float, str]] = []   # name, start ms, ms, thread
+
+    @contextmanager
+    def stage(self, name: str):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, (t - self.t0) * 1000, (time.perf_counter() - t) * 1000,
+                                threading.current_thread().name))
+
+    def mark(self, name: str):
+        """Record an instant, e.g. the first frame on screen."""
+        self.stages.append((name, (time.perf_counter() - self.t0) * 1000, 0.0,
+                            threading.current_thread().name))
+
+    @property
+    def total_ms(self) -> float:
+        return max((start + ms for _, start, ms, _ in self.stages), default=0.0)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.total_ms > self.budget_ms
+
+    def report(self) -> str:
+        lines = [f"  {name:<12} at {start:7.1f} ms  {ms:7.1f} ms  [{thread}]"
+                 for name, start, ms, thread in sorted(self.stages, key=lambda s: s[1])]
+        lines.append(f"  startup {self.total_ms:.1f} ms (budget {self.budget_ms:g} ms)"
+                     + ("  OVER BUDGET" if self.over_budget else ""))
+        return "\n".join(lines)
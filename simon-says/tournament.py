@@ -0,0 +1,287 @@
+"""Tournament mode: K independent games side by side in one window.
+
+Every board keeps its own :class:`core.SimonCore` (own seed, own SHOW and
+deadlines), but the pads of all boards live in one :class:`ButtonBank`,
+the particles in one :class:`ParticleSystem`, and the window, mixer, tones,
+fonts and pre-rendered frames are shared.  A logic step or a frame is one
+batched pass over every board, and only what changed is redrawn.  A click
+is routed to its board through the bank's hit index (pad ``i`` belongs to
+board ``i // 6``) or, off the pads, by viewport.
+
+    python tournament.py 8 [--bots] [--size 1600x900]
+    python tournament.py --bench 1 2 4 8 16        # headless frame-time scaling
+"""
+
+import argparse, math, os, random, time
+import numpy as np
+import pygame
+
+from constants import *
+from core import SimonCore, PLAY, START, GAMEOVER, EV_SHOW, EV_PRESS, EV_ROUND, EV_FAIL
+from buttonbank import ButtonBank, hex_layout
+from audio import ToneBank, AudioEngine, PRIO_UI, pre_init
+from effects import ParticleSystem
+from textcache import TextCache
+from timing import FixedStep, Pacer
+from render import make_backend, merge_rects
+
+PADS   = len(BUTTON_COLOURS)    # pads per board
+HEADER = 36                     # viewport strip for the player label and score
+FOOTER = 24                     # ... and for the timer bar
+
+
+class Tournament:
+    def __init__(self, k: int = 8, size=(1600, 900), fps: float = FPS, pacing: str = PACING,
+                 seed: int | None = None, bots: bool = False, render: str | None = None):
+        pre_init()
+        pygame.display.init()
+        pygame.font.init()
+        self.k    = k
+        self.gfx  = make_backend(render, size, f"Simon Says Pro – tournament ({k} boards)")
+        self.screen_rect = pygame.Rect((0, 0), size)
+
+        # Viewports: a near-square grid of equal cells
+        cols = math.ceil(math.sqrt(k)); rows = math.ceil(k / cols)
+        vw, vh = size[0] // cols, size[1] // rows
+        self.views = [pygame.Rect((i % cols) * vw, (i // cols) * vh, vw, vh) for i in range(k)]
+        # the hex board spans 2.4 pitches + a pad high and 2 pitches + a pad wide
+        pitch = BTN_SIZE + MARGIN
+        s = min((vw - 24) / (2 * pitch + BTN_SIZE), (vh - HEADER - FOOTER) / (2.4 * pitch + BTN_SIZE))
+        self.scale = s
+        rects = np.concatenate([hex_layout(int(BTN_SIZE * s), int(MARGIN * s),
+                                           (v.centerx, v.y + HEADER + (v.h - HEADER - FOOTER) // 2))
+                                for v in self.views])
+        self.bank = ButtonBank(rects, BUTTON_COLOURS * k)
+
+        self.step  = FixedStep()
+        self.pacer = Pacer(fps, pacing)
+        self.fx_dt = self.step.step_ms * FPS / 1000
+        rng = random.Random(seed)
+        self.cores = [SimonCore(PADS, seed=rng.getrandbits(64), clock=lambda: self.step.sim_ms)
+                      for _ in range(k)]
+        self.fx    = ParticleSystem(seed=seed)
+
+        # Shared assets
+        try:
+            pygame.mixer.init()
+        except pygame.error:
+            pass
+        self.audio = AudioEngine()
+        self.tones = ToneBank()
+        self.pad_tones = [self.tones.tone(f) for f in BUTTON_FREQS]
+        self.s_fail    = self.tones.tone(120, .8)
+        self.tones.wait()
+        self.font_small = pygame.font.Font(None, 26)
+        self.text       = TextCache()
+
+        # Bots play every board (demo / benchmark): next action time per board
+        self.bots   = bots
+        self._bot_rng = random.Random(seed)
+        self._bot_at  = [0.0] * k
+
+        self._bg        = self._build_background()
+        self._overlays  = [None] * k
+        self._keys      = [None] * k
+        self._dirty_prev: list[pygame.Rect] = []
+
+    # ---------------- Logic ----------------------------------
+    def _logic_step(self):
+        """One fixed step for every board; pads and particles advance in one pass each."""
+        now = self.step.tick()
+        for b, c in enumerate(self.cores):
+            if self.bots:
+                self._bot(b, c, now)
+            c.update(now)
+            self._react(b, now)
+        self.fx.update(self.fx_dt)
+
+    def _react(self, b, now):
+        base = b * PADS
+        for ev, idx in self.cores[b].drain():
+            if ev == EV_SHOW:
+                self.bank.light_up(base + idx, now, LIGHT_MS)
+                self.audio.play(self.pad_tones[idx])
+            elif ev == EV_PRESS:
+                self.bank.light_up(base + idx, now, PRESS_MS)
+                self.audio.play(self.pad_tones[idx], fade_ms=25)
+            elif ev == EV_ROUND:
+                self.fx.burst(*self.bank.center(base + idx), [self.bank.light_colour(base + idx)], 40)
+            elif ev == EV_FAIL:
+                self.audio.play(self.s_fail, PRIO_UI)
+                self.fx.burst(*self.views[b].center, self.bank.light_colours()[:PADS], 90)
+
+    def _bot(self, b, c, now):
+        if now < self._bot_at[b]:
+            return
+        rng = self._bot_rng
+        if c.state == PLAY:
+            want = c.pattern[c.player_idx]
+            c.press(want if rng.random() > .03 else (want + 1) % PADS, now)
+            self._bot_at[b] = now + max(120, rng.gauss(450, 150))
+        elif c.state in (START, GAMEOVER):
+            c.tap(now)
+            self._bot_at[b] = now + 1000
+        else:
+            self._bot_at[b] = now + 50
+
+    def click(self, pos, now):
+        """Route a click to the board under it."""
+        i = self.bank.hit(pos)
+        if i >= 0:
+            b, idx = divmod(i, PADS)
+            if self.cores[b].state == PLAY:
+                self.cores[b].press(idx, now)
+            else:
+                self.cores[b].tap(now)
+        else:
+            b = pygame.Rect(pos, (1, 1)).collidelist(self.views)
+            if b < 0:
+                return
+            self.cores[b].tap(now)
+        self._react(b, now)
+
+    # ---------------- Drawing --------------------------------
+    def _build_background(self):
+        bg = self.gfx.convert(pygame.Surface(self.screen_rect.size))
+        bg.fill((18, 18, 18))
+        for b, v in enumerate(self.views):
+            pygame.draw.rect(bg, (26, 26, 26), v.inflate(-6, -6), border_radius=8)
+            label = self.font_small.render(f"Player {b + 1}", True, (170, 170, 170))
+            bg.blit(label, (v.x + 12, v.y + 10))
+        self.bank.draw_idle(bg)
+        return bg
+
+    def _build_overlay(self, b):
+        """Score and state text of board ``b``, in viewport coordinates."""
+        v, c = self.views[b], self.cores[b]
+        ov = self.gfx.convert(pygame.Surface(v.size, pygame.SRCALPHA), alpha=True)
+        w, _ = self.text.number_size(self.font_small, "Score ", c.score, WHITE)
+        self.text.blit_number(ov, self.font_small, "Score ", c.score, WHITE, (v.w - w - 12, 10))
+        msg = {START: ("Click to start", WHITE), GAMEOVER: ("Game over", RED)}.get(c.state)
+        if msg:
+            t = self.text.render(self.font_small, *msg)
+            ov.blit(t, t.get_rect(center=(v.w // 2, HEADER // 2 + 2)))
+        return ov
+
+    def _bar(self, b):
+        v = self.views[b]
+        return pygame.Rect(v.x + v.w // 4, v.bottom - FOOTER + 6, v.w // 2, 8)
+
+    def draw(self, now, alpha=1.0):
+        """Redraw what changed on every board; returns the rects to present."""
+        dirty = []
+        for b, c in enumerate(self.cores):
+            key = (c.state, c.score)
+            if key != self._keys[b]:
+                self._overlays[b], self._keys[b] = self._build_overlay(b), key
+                dirty.append(self.views[b])
+            if c.state == PLAY:
+                dirty.append(self._bar(b))
+        lit = self.bank.animating()
+        dirty += [self.bank.bounds(i) for i in lit]
+        fx_rect = self.fx.bounds()
+        if fx_rect:
+            dirty.append(fx_rect.clip(self.screen_rect))
+
+        gfx = self.gfx
+        regions = merge_rects(dirty + self._dirty_prev) if gfx.partial else [self.screen_rect]
+        self._dirty_prev = dirty
+        for r in regions:
+            gfx.blit(self._bg, r, r)
+        self.bank.draw(gfx, lit)
+        self.fx.draw(gfx, alpha, self.screen_rect)
+        for r in regions:
+            for b in r.collidelistall(self.views):
+                v = self.views[b]
+                clip = r.clip(v)
+                gfx.blit(self._overlays[b], clip, clip.move(-v.x, -v.y))
+        for b, c in enumerate(self.cores):
+            if c.state == PLAY:
+                bar = self._bar(b)
+                frac = max(0, c.deadline_ms - now) / c.player_time_ms
+                gfx.rect((50, 50, 50), bar, border_radius=4)
+                gfx.rect((255 * (1 - frac), 255 * frac, 0), (bar.x, bar.y, int(bar.w * frac), bar.h),
+                         border_radius=4)
+        return regions
+
+    def present(self):
+        t = self.step.render_ms()
+        self.bank.update(t)
+        self.gfx.present(self.draw(t, self.step.alpha))
+
+    # ---------------- Main loop ------------------------------
+    def run(self):
+        step, running = self.step, True
+        while running:
+            for ev in pygame.event.get():
+                if ev.type == pygame.QUIT:
+                    running = False
+                elif ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
+                    self.click(ev.pos, step.sim_ms)
+            for _ in range(step.advance(time.perf_counter() * 1000)):
+                self._logic_step()
+            self.audio.pump()
+            if step.behind:
+                step.dropped += 1
+                continue
+            self.present()
+            self.pacer.wait()
+        self.close()
+
+    def close(self):
+        self.tones.close()
+        pygame.quit()
+
+
+# ---------------- Benchmark ------------------------------------
+def bench(ks=(1, 2, 4, 8, 16), frames=600, size=(1600, 900), seed=0, render=None) -> dict:
+    """Mean / p99 ms of a bot-played frame (logic + draw + present) per board count."""
+    out = {}
+    for k in ks:
+        t = Tournament(k, size, seed=seed, bots=True, render=render)
+        try:
+            step, dt = t.step, 1000 / FPS
+            ms = np.zeros(frames)
+            wall = 0.0
+            for f in range(frames):
+                t0 = time.perf_counter()
+                wall += dt
+                for _ in range(step.advance(wall)):
+                    t._logic_step()
+                t.present()
+                ms[f] = (time.perf_counter() - t0) * 1000
+            out[k] = {"mean_ms": round(ms.mean(), 3), "p99_ms": round(float(np.percentile(ms, 99)), 3),
+                      "per_board_ms": round(ms.mean() / k, 3), "rounds": sum(c.score for c in t.cores)}
+        finally:                            # not t.close(): the next run still needs pygame
+            t.audio.close()
+            t.tones.close()
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Simon Says Pro tournament: several boards, one window")
+    ap.add_argument("boards", type=int, nargs="?", default=8)
+    ap.add_argument("--size", default="1600x900", help="window size WxH")
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--bots", action="store_true", help="let bots play every board")
+    ap.add_argument("--render", choices=("surface", "texture"))
+    ap.add_argument("--bench", type=int, nargs="*", metavar="K",
+                    help="headless: frame time for each board count (default 1 2 4 8 16)")
+    ap.add_argument("--frames", type=int, default=600)
+    a = ap.parse_args(argv)
+    size = tuple(map(int, a.size.split("x")))
+
+    if a.bench is not None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        res = bench(a.bench or (1, 2, 4, 8, 16), a.frames, size, a.seed or 0, a.render)
+        for k, r in res.items():
+            print(f"{k:3} boards  {r['mean_ms']:7.3f} ms/frame  p99 {r['p99_ms']:7.3f}  "
+                  f"{r['per_board_ms']:6.3f} ms/board  ({r['rounds']} rounds won)")
+        pygame.quit()
+        return
+    Tournament(a.boards, size, seed=a.seed, bots=a.bots, render=a.render).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,8 @@ Simon Says – complete Pygame implementation
 Author: ChatGPT (2025‑06‑17)
 """
 
-import sys, random, math, time, os, pathlib
+import sys, random, math, time, os, json, pathlib, queue, sqlite3, threading
+from collections import OrderedDict
 
 import pygame
 
@@ -16,11 +17,6 @@ except ModuleNotFoundError:
     HAS_NUMPY = False
 # ==================================================
 
-# ---------------- Pygame init ---------------------
-pygame.mixer.pre_init(44100, -16, 1, 512)
-pygame.init()
-# --------------------------------------------------
-
 # -------------- Constants & colours ---------------
 WIDTH, HEIGHT   = 800, 600
 FPS             = 60
@@ -62,6 +58,117 @@ def make_tone(freq: float, dur: float = .35, volume: float = 1.0) -> pygame.mixe
     return pygame.sndarray.make_sound(audio)
 # --------------------------------------------------
 
+# -------------- Helper: text cache ---------------
+class TextCache:
+    """Bounded LRU of rendered strings plus a digit atlas for counters."""
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self.surfs   = OrderedDict()
+        self.glyphs  = {}
+        self.hits = self.misses = self.evictions = 0
+
+    def render(self, font, text, colour, antialias=True):
+        key = (font, text, tuple(colour), antialias)
+        surf = self.surfs.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.surfs.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = self.surfs[key] = font.render(text, antialias, colour)
+        if len(self.surfs) > self.maxsize:
+            self.surfs.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def digits(self, font, colour, antialias=True):
+        key = (font, tuple(colour), antialias)
+        atlas = self.glyphs.get(key)
+        if atlas is None:
+            self.misses += 1
+            atlas = self.glyphs[key] = {c: font.render(c, antialias, colour) for c in "0123456789-"}
+        else:
+            self.hits += 1
+        return atlas
+
+    def number_width(self, font, prefix, value, colour):
+        atlas = self.digits(font, colour)
+        return self.render(font, prefix, colour).get_width() + sum(atlas[c].get_width() for c in str(value))
+
+    def blit_number(self, surf, font, prefix, value, colour, pos):
+        x, y = pos
+        p = self.render(font, prefix, colour)
+        surf.blit(p, (x, y)); x += p.get_width()
+        atlas = self.digits(font, colour)
+        for c in str(value):
+            surf.blit(atlas[c], (x, y)); x += atlas[c].get_width()
+# --------------------------------------------------
+
+# -------------- Helper: score store --------------
+class ScoreStore:
+    """Finished games in SQLite (WAL), written by a background thread.
+
+    Errors go to stderr and :attr:`errors`; once the writer has stopped
+    (open failed, or closed) :attr:`dead` is set and games are only counted
+    in :attr:`dropped`, never queued.
+    """
+    COLUMNS = {"mode": "TEXT NOT NULL DEFAULT 'classic'", "rounds_ms": "TEXT NOT NULL DEFAULT '[]'"}
+
+    def __init__(self, path="simon_says1_scores.db", mode="classic"):
+        self.path    = path
+        self.mode    = mode
+        self.best    = 0
+        self.errors: list[Exception] = []
+        self.dead    = False
+        self.dropped = 0
+        self.q       = queue.SimpleQueue()
+        self.thread  = threading.Thread(target=self._writer, name="scorestore", daemon=True)
+        self.thread.start()
+
+    def _writer(self):
+        try:
+            db = sqlite3.connect(self.path, timeout=5)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS games (score INTEGER NOT NULL, ts REAL NOT NULL)")
+            have = {r[1] for r in db.execute("PRAGMA table_info(games)")}
+            for col, decl in self.COLUMNS.items():          # stores from before mode / round times
+                if col not in have:
+                    db.execute(f"ALTER TABLE games ADD COLUMN {col} {decl}")
+            db.execute("CREATE INDEX IF NOT EXISTS games_mode_score ON games (mode, score DESC)")
+            best = db.execute("SELECT MAX(score) FROM games WHERE mode = ?", (self.mode,)).fetchone()[0]
+            self.best = max(self.best, best or 0)
+        except sqlite3.Error as e:
+            self._error(e)
+            self.dead = True                 # no persistence, the game still runs
+            return
+        while (row := self.q.get()) is not None:
+            try:
+                with db:
+                    db.execute("INSERT INTO games (score, ts, mode, rounds_ms) VALUES (?, ?, ?, ?)", row)
+            except sqlite3.Error as e:
+                self._error(e)
+        self.dead = True
+        db.close()
+
+    def _error(self, e):
+        self.errors.append(e)
+        print(f"score store {self.path}: {e!r}", file=sys.stderr)
+
+    def record(self, score, rounds_ms=()):
+        self.best = max(self.best, score)
+        if self.dead:                        # nobody would drain the queue
+            self.dropped += 1
+            return
+        self.q.put((score, time.time(), self.mode, json.dumps([round(r) for r in rounds_ms])))
+
+    def close(self):
+        if not self.dead:
+            self.q.put(None)
+        self.thread.join(5)
+        if self.dropped:
+            print(f"score store {self.path}: {self.dropped} games not saved", file=sys.stderr)
+# --------------------------------------------------
+
 class Button:
     """A colourful square that lights up and plays a tone."""
     def __init__(self, rect: pygame.Rect, dark_c, light_c, tone: pygame.mixer.Sound | None):
@@ -89,21 +196,43 @@ class Button:
         else:
             self.colour, self.scale = self.dark_colour, 1.0
 
-    def draw(self, surf: pygame.Surface):
-        rect = self.base_rect.inflate(
+    @property
+    def animating(self) -> bool:
+        return self.scale != 1.0
+
+    def bounds(self) -> pygame.Rect:
+        return self.base_rect.inflate(
             self.base_rect.w * (self.scale - 1),
             self.base_rect.h * (self.scale - 1)
         )
+
+    def draw(self, surf: pygame.Surface):
+        rect = self.bounds()
         pygame.draw.rect(surf, self.colour, rect, border_radius=20)
         pygame.draw.rect(surf, WHITE, rect, width=3, border_radius=20)
 
     def collidepoint(self, pos):
         return self.base_rect.collidepoint(pos)
 
+def merge_rects(rects):
+    """Union overlapping rects so no pixel is composited twice."""
+    out = []
+    for r in rects:
+        r = r.copy()
+        i = r.collidelist(out)
+        while i != -1:
+            r.union_ip(out.pop(i))
+            i = r.collidelist(out)
+        out.append(r)
+    return out
+
 class SimonGame:
     START, SHOW, PLAYER, GAMEOVER = range(4)
 
     def __init__(self):
+        # pygame starts here, not at import, so importing this module stays cheap
+        pygame.mixer.pre_init(44100, -16, 1, 512)
+        pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Simon Says • Pygame")
 
@@ -113,6 +242,7 @@ class SimonGame:
         self.font_big   = pygame.font.SysFont(None, 72)
         self.font_med   = pygame.font.SysFont(None, 40)
         self.font_small = pygame.font.SysFont(None, 28)
+        self.text       = TextCache()
 
         # Buttons
         btn_pos = [
@@ -133,7 +263,9 @@ class SimonGame:
         self.pattern        = []
         self.player_index   = 0
         self.score          = 0
-        self.best_score     = 0
+        self.round_ms: list[int] = []     # time taken to repeat each completed round
+        self.play_start_ms  = 0
+        self.scores         = ScoreStore()
 
         self.show_idx       = -1
         self.show_next_ms   = 0          # when to flash next button
@@ -143,6 +275,14 @@ class SimonGame:
         self.beep_good = make_tone(880, .15)
         self.beep_bad  = make_tone(110, .7)
 
+        # Render layers – static background is composited once
+        self.screen_rect = self.screen.get_rect()
+        self.timer_rect  = pygame.Rect(CENTER_X-150, HEIGHT-50, 300, 18)
+        self.background  = self._build_background()
+        self.overlay     = None
+        self.overlay_key = None
+        self.dirty_prev: list[pygame.Rect] = []
+
     # ---------- state helpers ----------
     def _add_step(self):
         self.pattern.append(random.randrange(4))
@@ -150,6 +290,7 @@ class SimonGame:
     def start_game(self):
         self.pattern.clear()
         self.score = 0
+        self.round_ms.clear()
         self._add_step()
         self.state = self.SHOW
         self.show_idx = -1
@@ -158,7 +299,11 @@ class SimonGame:
     def game_over(self):
         self.state = self.GAMEOVER
         if self.beep_bad: self.beep_bad.play()
-        self.best_score = max(self.best_score, self.score)
+        self.scores.record(self.score, self.round_ms)
+
+    @property
+    def best_score(self):
+        return self.scores.best
 
     # ---------- main loop ----------
     def run(self):
@@ -166,6 +311,7 @@ class SimonGame:
             now = pygame.time.get_ticks()
             for ev in pygame.event.get():
                 if ev.type == pygame.QUIT:
+                    self.scores.close()
                     pygame.quit(); sys.exit()
                 if ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
                     self._handle_click(ev.pos, now)
@@ -178,6 +324,7 @@ class SimonGame:
                         # switch to player turn
                         self.state = self.PLAYER
                         self.player_index = 0
+                        self.play_start_ms = now
                         self.response_deadline = now + 5000
                     else:
                         btn = self.buttons[self.pattern[self.show_idx]]
@@ -192,8 +339,7 @@ class SimonGame:
             for b in self.buttons:
                 b.update(now)
 
-            self._draw(now)
-            pygame.display.flip()
+            pygame.display.update(self._draw(now))
             self.clock.tick(FPS)
 
     # ---------- input ----------
@@ -218,6 +364,7 @@ class SimonGame:
                         # round done
                         if self.beep_good: self.beep_good.play()
                         self.score += 1
+                        self.round_ms.append(now - self.play_start_ms)
                         self._add_step()
                         self.state = self.SHOW
                         self.show_idx = -1
@@ -230,54 +377,90 @@ class SimonGame:
                 break
 
     # ---------- drawing ----------
-    def _draw(self, now):
-        self.screen.fill(DARK_BG)
+    def _build_background(self):
+        bg = pygame.Surface((WIDTH, HEIGHT)).convert()
+        bg.fill(DARK_BG)
 
         # gradient background effect
         for y in range(0, HEIGHT, 2):
             shade = 25 + int(25 * y / HEIGHT)
-            pygame.draw.line(self.screen, (shade, shade, shade), (0, y), (WIDTH, y))
+            pygame.draw.line(bg, (shade, shade, shade), (0, y), (WIDTH, y))
 
         # center circle
-        pygame.draw.circle(self.screen, (50, 50, 50), (CENTER_X, CENTER_Y), 55)
-        pygame.draw.circle(self.screen, WHITE,            (CENTER_X, CENTER_Y), 55, 3)
+        pygame.draw.circle(bg, (50, 50, 50), (CENTER_X, CENTER_Y), 55)
+        pygame.draw.circle(bg, WHITE,            (CENTER_X, CENTER_Y), 55, 3)
 
-        # buttons
+        # idle buttons
         for b in self.buttons:
-            b.draw(self.screen)
+            b.draw(bg)
+        return bg
 
-        # UI text
+    def _build_overlay(self):
+        """UI text for the current state; rebuilt only when its content changes."""
+        ov = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA).convert_alpha()
         if self.state == self.START:
-            self._draw_center_text("SIMON SAYS", self.font_big, YELLOW, -120)
-            self._draw_center_text("Click anywhere to start", self.font_med, WHITE, -30)
+            self._draw_center_text("SIMON SAYS", self.font_big, YELLOW, -120, ov)
+            self._draw_center_text("Click anywhere to start", self.font_med, WHITE, -30, ov)
             if self.best_score:
-                self._draw_center_text(f"High Score  {self.best_score}", self.font_small, WHITE, 40)
+                self._draw_center_number("High Score  ", self.best_score, self.font_small, WHITE, 40, ov)
 
         elif self.state == self.SHOW:
-            self._draw_center_text("Watch…", self.font_med, WHITE, -260)
+            self._draw_center_text("Watch…", self.font_med, WHITE, -260, ov)
         elif self.state == self.PLAYER:
-            self._draw_center_text("Your turn!", self.font_med, WHITE, -260)
-            # timer bar
-            remain = max(0, self.response_deadline - now)
-            bar_w = int(300 * remain / 5000)
-            colour = (255 * (1 - remain/5000), 255 * remain/5000, 0)
-            pygame.draw.rect(self.screen, (40,40,40), (CENTER_X-150, HEIGHT-50, 300, 18))
-            pygame.draw.rect(self.screen, colour,     (CENTER_X-150, HEIGHT-50, bar_w, 18))
+            self._draw_center_text("Your turn!", self.font_med, WHITE, -260, ov)
         elif self.state == self.GAMEOVER:
-            self._draw_center_text("GAME OVER!", self.font_big, RED, -120)
-            self._draw_center_text(f"Score  {self.score}", self.font_med, WHITE, -30)
-            self._draw_center_text("Click to play again", self.font_small, WHITE, 40)
+            self._draw_center_text("GAME OVER!", self.font_big, RED, -120, ov)
+            self._draw_center_number("Score  ", self.score, self.font_med, WHITE, -30, ov)
+            self._draw_center_text("Click to play again", self.font_small, WHITE, 40, ov)
 
         # persistent score display during play
         if self.state in (self.SHOW, self.PLAYER):
-            score_surf = self.font_med.render(f"Score  {self.score}", True, WHITE)
-            self.screen.blit(score_surf, (20, 20))
-            best_surf  = self.font_small.render(f"High {self.best_score}", True, WHITE)
-            self.screen.blit(best_surf, (20, 60))
-
-    def _draw_center_text(self, txt, font, colour, y_offset=0):
-        surf = font.render(txt, True, colour)
-        self.screen.blit(surf, (CENTER_X - surf.get_width()//2, CENTER_Y + y_offset))
+            self.text.blit_number(ov, self.font_med,   "Score  ", self.score,      WHITE, (20, 20))
+            self.text.blit_number(ov, self.font_small, "High ",   self.best_score, WHITE, (20, 60))
+        return ov
+
+    def _draw(self, now):
+        """Redraw only what changed; returns the rects to push to the display."""
+        key = (self.state, self.score, self.best_score)
+        full = key != self.overlay_key
+        if full:
+            self.overlay, self.overlay_key = self._build_overlay(), key
+
+        lit = [b for b in self.buttons if b.animating]
+        dirty = [b.bounds() for b in lit]
+        if self.state == self.PLAYER:
+            dirty.append(self.timer_rect)
+
+        regions = [self.screen_rect] if full else merge_rects(dirty + self.dirty_prev)
+        self.dirty_prev = dirty
+
+        for r in regions:
+            self.screen.blit(self.background, r, r)
+        for b in lit:
+            b.draw(self.screen)
+        for r in regions:
+            self.screen.blit(self.overlay, r, r)
+
+        if self.state == self.PLAYER:
+            # timer bar
+            remain = max(0, self.response_deadline - now)
+            bar_w = int(300 * remain / 5000)
+            colour = (255 * (1 - remain/5000), 255 * remain/5000, 0)
+            pygame.draw.rect(self.screen, (40,40,40), self.timer_rect)
+            pygame.draw.rect(self.screen, colour,     (self.timer_rect.x, self.timer_rect.y, bar_w, 18))
+        return regions
+
+    def _draw_center_text(self, txt, font, colour, y_offset=0, surf=None):
+        if surf is None:
+            surf = self.screen
+        text = self.text.render(font, txt, colour)
+        surf.blit(text, (CENTER_X - text.get_width()//2, CENTER_Y + y_offset))
+
+    def _draw_center_number(self, prefix, value, font, colour, y_offset=0, surf=None):
+        if surf is None:
+            surf = self.screen
+        w = self.text.number_width(font, prefix, value, colour)
+        self.text.blit_number(surf, font, prefix, value, colour, (CENTER_X - w//2, CENTER_Y + y_offset))
 
 # ---------------- Launch --------------------------
 if __name__ == "__main__":